@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from .Logger import logger
+from .Rgb565 import Rgb565
+
+
+class Animation:
+    """
+        Animation decoded once into RGB565 frames
+
+        Each frame keeps its own duration, frames over the memory budget are dropped.
+        Durations up to MIN_DURATION (often 0 in GIF files) are played as DEFAULT_DURATION, like browsers do
+    """
+
+    DEFAULT_DURATION: float = 0.1
+    MIN_DURATION: float = 0.01
+
+    def __init__(self, frames: list[np.ndarray], durations: list[float], loop: int = 0) -> None:
+        assert len(frames) > 0, 'Animation must have frames'
+        self.frames: list[np.ndarray] = frames
+        self.durations: list[float] = [duration if duration > self.MIN_DURATION else self.DEFAULT_DURATION
+                                       for duration in durations]
+        self.loop: int = loop
+        self.nbytes: int = sum(frame.nbytes for frame in frames)
+
+    @staticmethod
+    def fromImage(image: Image.Image, memory_budget: int) -> 'Animation':
+        """
+            Decode every frame of an animated image (GIF), the loop count comes from the file
+        """
+        frames: list[np.ndarray] = []
+        durations: list[float] = []
+        size: int = 0
+        frame: Image.Image
+        for frame in ImageSequence.Iterator(image):
+            pixels: np.ndarray = Rgb565.fromImage(frame)
+            if frames and size + pixels.nbytes > memory_budget:
+                logger.warning('Animation truncated to ' + str(len(frames)) +
+                               ' frames to fit the memory budget')
+                break
+            frames.append(pixels)
+            durations.append(frame.info.get(
+                'duration', Animation.DEFAULT_DURATION * 1000) / 1000)
+            size += pixels.nbytes
+        return Animation(frames, durations, image.info.get('loop', 1))
+
+    @staticmethod
+    def fromFiles(paths: list[str], duration: float, memory_budget: int, loop: int = 0) -> 'Animation':
+        """
+            Decode an image sequence, every frame shown for duration seconds
+        """
+        frames: list[np.ndarray] = []
+        size: int = 0
+        path: str
+        for path in paths:
+            with Image.open(path) as image:
+                pixels: np.ndarray = Rgb565.fromImage(image)
+            if frames and size + pixels.nbytes > memory_budget:
+                logger.warning('Animation truncated to ' + str(len(frames)) +
+                               ' frames to fit the memory budget')
+                break
+            frames.append(pixels)
+            size += pixels.nbytes
+        return Animation(frames, [duration] * len(frames), loop)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import threading
+from time import monotonic
+from typing import Callable
+
+import numpy as np
+
+from .Animation import Animation
+
+
+class AnimationPlayer:
+    """
+        Play an animation from a background thread
+
+        Frames are shown at their own duration against monotonic deadlines,
+        loop is the number of plays, 0 plays forever
+    """
+
+    def __init__(self, animation: Animation, draw: Callable[[np.ndarray, int, int], None], x: int, y: int, loop: int | None = None) -> None:
+        self.animation: Animation = animation
+        self.draw: Callable[[np.ndarray, int, int], None] = draw
+        self.x: int = x
+        self.y: int = y
+        self.loop: int = animation.loop if loop is None else loop
+        self.stopping: threading.Event = threading.Event()
+        self.thread: threading.Thread = threading.Thread(
+            name='animation-player', target=self.__run, daemon=True)
+
+    def start(self) -> None:
+        """
+            Start playing
+        """
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+            Stop playing after the current frame
+        """
+        self.stopping.set()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def isPlaying(self) -> bool:
+        return self.thread.is_alive()
+
+    def __run(self) -> None:
+        deadline: float = monotonic()
+        plays: int = 0
+        while not self.stopping.is_set() and (self.loop == 0 or plays < self.loop):
+            frame: np.ndarray
+            duration: float
+            for frame, duration in zip(self.animation.frames, self.animation.durations):
+                self.draw(frame, self.x, self.y)
+                deadline = max(deadline + duration, monotonic())
+                if self.stopping.wait(deadline - monotonic()):
+                    return
+            plays += 1
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+from PIL import Image
+
+from .Logger import logger
+from .Rgb565 import Rgb565
+
+
+class AssetCache:
+    """
+        On-disk cache of converted images
+
+        Blobs are addressed by the source file hash, size and mode and are memory-mapped on load.
+        An index of source file stats avoids hashing unchanged files, blobs of a changed file are removed
+    """
+
+    MODES: dict[str, tuple] = {
+        'rgb565': (Rgb565.DTYPE, ()),
+        'rgb': (np.dtype(np.uint8), (3,))
+    }
+    INDEX_FILE: str = 'index.json'
+
+    def __init__(self, path: str = '.cache/assets/') -> None:
+        self.path: str = path
+        self.lock: threading.Lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.index: dict[str, dict] = self.__loadIndex()
+
+    @staticmethod
+    def fromConfig(config: dict) -> 'AssetCache | None':
+        """
+            Build the cache of the 'asset_cache' configuration, None when disabled
+        """
+        asset_cache_conf: dict = config.get('asset_cache', {})
+        if not asset_cache_conf.get('enabled', True):
+            return None
+        return AssetCache(asset_cache_conf.get('path', '.cache/assets/'))
+
+    def load(self, source: str, mode: str = 'rgb565') -> np.ndarray:
+        """
+            Get the converted image as a read-only memory-mapped array, converting it on a miss
+        """
+        dtype, channels = self.MODES[mode]
+        with self.lock:
+            entry: dict = self.__entry(source)
+            width, height = entry['size']
+            blob: str = self.path + entry['hash'] + '-' + \
+                str(width) + 'x' + str(height) + '-' + mode + '.bin'
+            if not os.path.exists(blob):
+                self.__convert(source, mode, blob)
+            return np.memmap(blob, dtype=dtype, mode='r', shape=(height, width) + channels)
+
+    def warm(self, sources: list[str], modes: tuple[str, ...] = ('rgb565', 'rgb')) -> None:
+        """
+            Convert sources ahead of time
+        """
+        source: str
+        for source in sources:
+            mode: str
+            for mode in modes:
+                self.load(source, mode)
+            logger.info('Asset cache warmed for ' + source)
+
+    def warmThemes(self, assets_dir: str = 'assets/') -> None:
+        """
+            Convert every theme of the assets directory ahead of time
+        """
+        self.warm(sorted(glob.glob(assets_dir + 'themes/*.png')))
+
+    def __entry(self, source: str) -> dict:
+        """
+            Get the index entry of a source, hashing it again only if its stats changed
+        """
+        stat: os.stat_result = os.stat(source)
+        signature: list[int] = [stat.st_mtime_ns, stat.st_size]
+        key: str = os.path.abspath(source)
+        entry: dict | None = self.index.get(key)
+        if entry is not None and entry['signature'] == signature:
+            return entry
+        with open(source, 'rb') as f:
+            digest: str = hashlib.sha256(f.read()).hexdigest()
+        with Image.open(source) as image:
+            size: list[int] = list(image.size)
+        previous: dict | None = entry
+        entry = {'signature': signature, 'hash': digest, 'size': size}
+        self.index[key] = entry
+        if previous is not None and previous['hash'] != digest:
+            self.__removeBlobs(previous['hash'])
+        self.__saveIndex()
+        return entry
+
+    def __convert(self, source: str, mode: str, blob: str) -> None:
+        """
+            Decode and convert a source, written atomically to its blob
+        """
+        with Image.open(source) as image:
+            if mode == 'rgb565':
+                pixels: np.ndarray = Rgb565.fromImage(image)
+            else:
+                pixels: np.ndarray = np.asarray(
+                    Rgb565.toRGB(image), dtype=np.uint8)
+        self.__write(blob, pixels.tobytes())
+        logger.info('Asset cache converted ' + source + ' to ' + mode)
+
+    def __removeBlobs(self, digest: str) -> None:
+        """
+            Remove the blobs of a hash no indexed source uses anymore
+        """
+        if any(entry['hash'] == digest for entry in self.index.values()):
+            return
+        blob: str
+        for blob in glob.glob(self.path + digest + '-*.bin'):
+            os.remove(blob)
+            logger.info('Asset cache removed stale ' + blob)
+
+    def __loadIndex(self) -> dict[str, dict]:
+        try:
+            with open(self.path + self.INDEX_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __saveIndex(self) -> None:
+        self.__write(self.path + self.INDEX_FILE, json.dumps(self.index).encode())
+
+    def __write(self, path: str, data: bytes) -> None:
+        """
+            Write a file atomically through a temporary file of its own,
+            so other caches on the same directory (other panels, render workers) never share it
+        """
+        fd, temporary = tempfile.mkstemp(
+            dir=self.path, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import os
+
+import numpy as np
+from PIL import Image
+
+from .AssetCache import AssetCache
+from .Logger import logger
+from .Rgb565 import Rgb565
+
+
+class BackgroundLayer:
+    """
+        Theme or background image decoded once
+
+        Keep resident RGB and RGB565 copies, regions are served as array views.
+        With an asset cache both copies are memory-mapped from the converted blobs instead
+    """
+
+    def __init__(self, path: str, cache: AssetCache | None = None) -> None:
+        self.path: str = path
+        self.signature: tuple[int, int] = self.__stat()
+        if cache is not None:
+            self.rgb: np.ndarray = cache.load(path, 'rgb')
+            self.rgb565: np.ndarray = cache.load(path, 'rgb565')
+        else:
+            with Image.open(path) as image:
+                self.rgb: np.ndarray = np.asarray(
+                    Rgb565.toRGB(image), dtype=np.uint8)
+            self.rgb565: np.ndarray = Rgb565.fromArray(self.rgb)
+            logger.info('Decode background ' + path)
+        self.height: int = self.rgb.shape[0]
+        self.width: int = self.rgb.shape[1]
+
+    def isStale(self) -> bool:
+        """
+            Check if the file changed since it was decoded
+        """
+        try:
+            return self.__stat() != self.signature
+        except OSError:
+            return True
+
+    def crop(self, box: tuple) -> np.ndarray:
+        """
+            Get a (height, width, 3) RGB view of the box
+        """
+        x0, y0, x1, y1 = box
+        return self.rgb[y0:y1, x0:x1]
+
+    def crop565(self, box: tuple) -> np.ndarray:
+        """
+            Get a (height, width) RGB565 view of the box
+        """
+        x0, y0, x1, y1 = box
+        return self.rgb565[y0:y1, x0:x1]
+
+    def image(self, box: tuple) -> Image.Image:
+        """
+            Get a Pillow image copy of the box
+        """
+        return Image.fromarray(self.crop(box), 'RGB')
+
+    def __stat(self) -> tuple[int, int]:
+        stat: os.stat_result = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+
+import copy
+import glob
+import platform
+import tracemalloc
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from .Com import Com
+from .Config import Config
+from .Display import Display
+from .Emulator import Emulator
+from .RenderPool import RenderPool
+from .RingBuffer import RingBuffer
+from .Scheduler import Scheduler
+from .WidgetPlan import WidgetPlan
+
+
+class Benchmark:
+    """
+        Time the render and transmit pipeline without hardware
+
+        Every case draws into an Emulator with no link delay, the simulated FPS adds the
+        time its bytes would take at baudrate to the measured CPU time.
+        Each case runs twice, timed then under tracemalloc for allocations.
+        With synthetic, scheduler ticks sample waveforms instead of the machine, for comparable runs
+    """
+
+    PARAMS: dict = {
+        'txt_static': 'static_text_informations',
+        'txt_dynamic': 'dynamic_text_informations',
+        'img_static': 'static_image',
+        'widgets': 'widgets'
+    }
+    TILE_SIZE: int = 32
+
+    SYNTHETIC_METRICS: dict = {
+        '*': {'waveform': 'sine', 'min': 0, 'max': 100, 'period': 5, 'unit': '%'}
+    }
+
+    def __init__(self, configuration: Config, iterations: int = 50, baudrate: int = 115200, synthetic: bool = False, render_workers: int = 0) -> None:
+        self.configuration: Config = configuration
+        self.config: dict = configuration.config
+        self.config['hot_reload_config'] = False
+        self.synthetic: bool = synthetic
+        if synthetic:
+            providers_conf: dict = dict(self.config.get('metric_providers', {}))
+            providers_conf['synthetic'] = {'metrics': self.SYNTHETIC_METRICS, 'step': 0.1}
+            providers_conf['order'] = ['synthetic']
+            self.config['metric_providers'] = providers_conf
+        if render_workers:
+            self.config['render_pool'] = dict(
+                self.config.get('render_pool', {}), enabled=True, workers=render_workers)
+        self.render_pool: RenderPool | None = None
+        self.iterations: int = iterations
+        self.baudrate: int = baudrate
+        self.theme: str = configuration.getTheme()
+        self.width: int = self.config.get('display_width', 320)
+        self.height: int = self.config.get('display_height', 480)
+
+    def run(self, themes: list[str] | None = None) -> dict:
+        """
+            Run every case, scheduler ticks once per theme (every theme of the assets directory by default)
+        """
+        if themes is None:
+            themes = sorted(glob.glob(self.config.get(
+                'assets_dir', 'assets/') + 'themes/*.png'))
+        self.render_pool = RenderPool.fromConfig(self.config)
+        try:
+            cases: list[dict] = [
+                self.__displayPILImage(False),
+                self.__displayPILImage(True),
+                self.__displayText(False),
+                self.__displayText(True),
+                self.__displayProgressBar(),
+                self.__displaySparkline()
+            ]
+            theme: str
+            for theme in themes:
+                cases.append(self.__schedulerTick(theme))
+        finally:
+            if self.render_pool:
+                self.render_pool.close()
+                self.render_pool = None
+        return {
+            'environment': self.__environment(),
+            'cases': cases
+        }
+
+    def __environment(self) -> dict:
+        return {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'iterations': self.iterations,
+            'baudrate': self.baudrate,
+            'display': [self.width, self.height],
+            'synthetic_metrics': self.synthetic,
+            'render_workers': self.config['render_pool']['workers'] if self.config.get('render_pool', {}).get('enabled') else 0,
+            'features': {name: self.config.get(name, {}).get('enabled', True)
+                         for name in ('framebuffer', 'compositor', 'text_cache', 'glyph_atlas', 'asset_cache')}
+        }
+
+    def __pipeline(self) -> tuple[Emulator, Com, Display]:
+        """
+            Make a fresh display writing to an emulator
+        """
+        config: dict = copy.deepcopy(self.config)
+        emulator: Emulator = Emulator(self.width, self.height, None)
+        com: Com = Com(config, emulator)
+        return emulator, com, Display(com, com.serial, config, None, self.render_pool)
+
+    def __displayPILImage(self, tile: bool) -> dict:
+        emulator, com, display = self.__pipeline()
+        if tile:
+            generator: np.random.Generator = np.random.default_rng(0)
+            images: list[Image.Image] = [Image.fromarray(generator.integers(
+                0, 256, (self.TILE_SIZE, self.TILE_SIZE, 3), dtype=np.uint8), 'RGB') for _ in range(2)]
+            columns: int = self.width // self.TILE_SIZE
+            rows: int = self.height // self.TILE_SIZE
+
+            def call(i: int) -> None:
+                position: int = i % (columns * rows)
+                display.displayPILImage(images[i % 2], position % columns * self.TILE_SIZE,
+                                        position // columns * self.TILE_SIZE)
+        else:
+            with Image.open(self.theme) as image:
+                images: list[Image.Image] = [image.convert('RGB')]
+            images.append(ImageOps.invert(images[0]))
+
+            def call(i: int) -> None:
+                display.displayPILImage(images[i % 2], 0, 0)
+        return self.__measure('display_pil_image_' + ('tile' if tile else 'fullscreen'),
+                              call, emulator, com)
+
+    def __displayText(self, transparent: bool) -> dict:
+        emulator, com, display = self.__pipeline()
+        defaults: dict = Display.DEFAULT_TEXT_PARAM
+        display.displayBitmap(self.theme, 0, 0)
+
+        def call(i: int) -> None:
+            display.displayText(f'{i % 1000:>3}.{i // 1000 % 10} %', 10, 10, defaults['font_path'], defaults['font_size'],
+                                defaults['font_color'], defaults['background_color'],
+                                self.theme if transparent else None)
+        return self.__measure('display_text_' + ('transparent' if transparent else 'solid'),
+                              call, emulator, com)
+
+    def __displayProgressBar(self) -> dict:
+        emulator, com, display = self.__pipeline()
+
+        def call(i: int) -> None:
+            display.displayProgressBar(10, 400, 200, 20, value=i % 100 + 1)
+        return self.__measure('display_progress_bar', call, emulator, com)
+
+    def __displaySparkline(self) -> dict:
+        """
+            One new sample per call on a 200 pixels wide graph
+        """
+        emulator, com, display = self.__pipeline()
+        plan: WidgetPlan = WidgetPlan.fromElement('sparkline', {
+            'type': 'sparkline', 'x': 10, 'y': 400, 'width': 200, 'height': 50}, self.theme, None)
+        ring: RingBuffer = RingBuffer(plan.width)
+
+        def call(i: int) -> None:
+            ring.append(float(i), 50 + 45 * np.sin(i / 5))
+            display.displaySparkline(plan, ring.last(plan.width))
+        return self.__measure('display_sparkline', call, emulator, com)
+
+    def __schedulerTick(self, theme: str) -> dict:
+        """
+            Time frames of the configured elements over the theme, themes of another size than the display are skipped
+        """
+        with Image.open(theme) as image:
+            size: tuple[int, int] = image.size
+        if size != (self.width, self.height):
+            return {
+                'name': 'scheduler_tick',
+                'theme': theme,
+                'skipped': 'theme is ' + str(size[0]) + 'x' + str(size[1]) + ', display is ' +
+                           str(self.width) + 'x' + str(self.height)
+            }
+        emulator, com, display = self.__pipeline()
+        scheduler: Scheduler = Scheduler(
+            self.configuration, theme, display, com)
+        scheduler.start(self.PARAMS)
+
+        def call(i: int) -> None:
+            scheduler.collector.collect()
+            scheduler.tick()
+        try:
+            result: dict = self.__measure(
+                'scheduler_tick', call, emulator, com)
+        finally:
+            scheduler.stop()
+        result['theme'] = theme
+        return result
+
+    def __measure(self, name: str, call: Callable[[int], None], emulator: Emulator, com: Com) -> dict:
+        """
+            Time iterations of call, then run them again under tracemalloc
+        """
+        call(0)
+        com.flush()
+        before: dict = emulator.stats()
+        start: float = perf_counter()
+        i: int
+        for i in range(1, self.iterations + 1):
+            call(i)
+        com.flush()
+        elapsed: float = perf_counter() - start
+        after: dict = emulator.stats()
+
+        tracemalloc.start()
+        for i in range(self.iterations + 1, 2 * self.iterations + 1):
+            call(i)
+        com.flush()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        com.close()
+
+        pixels: int = after['pixels'] - before['pixels']
+        sent: int = after['bytes_received'] - before['bytes_received']
+        seconds_per_call: float = elapsed / self.iterations
+        link_seconds_per_call: float = sent / self.iterations * \
+            Emulator.BITS_PER_BYTE / self.baudrate
+        return {
+            'name': name,
+            'calls': self.iterations,
+            'seconds': elapsed,
+            'seconds_per_call': seconds_per_call,
+            'pixels': pixels,
+            'pixels_per_second': pixels / elapsed if elapsed > 0 else 0.0,
+            'bytes_emitted': sent,
+            'bytes_per_call': sent / self.iterations,
+            'allocated_peak_bytes': peak,
+            'allocated_retained_bytes': retained,
+            'link_seconds_per_call': link_seconds_per_call,
+            'simulated_fps': 1.0 / (seconds_per_call + link_seconds_per_call)
+        }
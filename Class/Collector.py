@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import math
+import re
+import threading
+from time import monotonic, time
+from typing import Iterable
+
+from .Logger import logger
+from .MetricRegistry import MetricRegistry
+from .RingBuffer import RingBuffer
+from .Telemetry import Telemetry
+
+
+class Collector:
+    """
+        Background metric sampling
+
+        Sample the configured metrics on its own cadence and keep their history in ring buffers,
+        so the render loop only reads the latest values.
+        Each sampling is one batched collect per metric provider.
+        Several schedulers can share a collector, each setting its own metrics
+    """
+
+    VALUE_PATTERN: re.Pattern = re.compile(r'-?\d+(?:\.\d+)?')
+    UNIT_PATTERN: re.Pattern = re.compile(r'^\s*-?\d+(?:\.\d+)?([KMGTPEZY])\b')
+    UNITS: str = 'KMGTPEZY'
+
+    def __init__(self, registry: MetricRegistry, interval_ms: int = 1000, history_size: int = 300) -> None:
+        self.registry: MetricRegistry = registry
+        self.interval: float = interval_ms / 1000
+        self.history_size: int = history_size
+        self.metrics: set[tuple[str, str | None]] = set()
+        self.owners: dict[object, set[tuple[str, str | None]]] = {}
+        self.buffers: dict[tuple[str, str | None], RingBuffer] = {}
+        self.failing: set[tuple[str, str | None]] = set()
+        self.lock: threading.Lock = threading.Lock()
+        self.stopping: threading.Event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    @staticmethod
+    def fromConfig(config: dict, telemetry: Telemetry | None = None) -> 'Collector':
+        """
+            Build the collector of the 'collector' configuration with its own metric registry
+        """
+        collector_conf: dict = config.get('collector', {})
+        return Collector(
+            MetricRegistry.fromConfig(config, telemetry),
+            collector_conf.get('interval_ms', 1000),
+            collector_conf.get('history_size', 300))
+
+    def setMetrics(self, metrics: Iterable[tuple[str, str | None]], owner: object = None) -> None:
+        """
+            Set the (metric, param) pairs the owner samples,
+            keeping the history of the ones still used by any owner
+        """
+        with self.lock:
+            self.owners[owner] = set(metrics)
+            self.metrics = set().union(*self.owners.values())
+            self.buffers = {key: self.buffers.get(key) or RingBuffer(self.history_size)
+                            for key in self.metrics}
+
+    def start(self) -> None:
+        """
+            Take a first sample then keep sampling in the background
+        """
+        self.collect()
+        self.stopping.clear()
+        self.thread = threading.Thread(
+            name='metric-collector', target=self.__run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+            Stop the background sampling and close the metric providers
+        """
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+        self.registry.close()
+
+    def collect(self) -> None:
+        """
+            Sample every configured metric once
+        """
+        with self.lock:
+            metrics: set[tuple[str, str | None]] = self.metrics
+            buffers: dict[tuple[str, str | None], RingBuffer] = self.buffers
+        results: dict[tuple[str, str | None], str | Exception] = self.registry.collect(metrics)
+        now: float = time()
+        key: tuple[str, str | None]
+        for key, result in results.items():
+            if isinstance(result, Exception):
+                if key not in self.failing:
+                    logger.warning('Unable to sample ' + key[0] + ' ' + str(result))
+                    self.failing.add(key)
+                continue
+            self.failing.discard(key)
+            buffers[key].append(now, self.parseValue(result), result)
+
+    def latest(self, metric: str, param: str | None = None) -> str:
+        """
+            Get the latest formatted value without waiting for the sampling
+        """
+        buffer: RingBuffer | None = self.buffers.get((metric, param))
+        if buffer is None:
+            return ''
+        sample: tuple[float, float, str] | None = buffer.latest()
+        return sample[2] if sample else ''
+
+    def latestValue(self, metric: str, param: str | None = None) -> float:
+        """
+            Get the latest numeric value, NaN until the metric is sampled
+        """
+        buffer: RingBuffer | None = self.buffers.get((metric, param))
+        if buffer is None:
+            return math.nan
+        sample: tuple[float, float, str] | None = buffer.latest()
+        return sample[1] if sample else math.nan
+
+    def history(self, metric: str, param: str | None = None, count: int | None = None, since: float | None = None) -> list[tuple[float, float]]:
+        """
+            Get the (timestamp, value) history of a metric, the last count samples or the samples since a timestamp
+        """
+        buffer: RingBuffer | None = self.buffers.get((metric, param))
+        if buffer is None:
+            return []
+        if since is not None:
+            return buffer.since(since)
+        return buffer.last(buffer.size if count is None else count)
+
+    @staticmethod
+    def parseValue(text: str) -> float:
+        """
+            Get the numeric value of a formatted metric, human readable byte units are expanded
+        """
+        match: re.Match | None = Collector.VALUE_PATTERN.search(str(text))
+        if match is None:
+            return math.nan
+        value: float = float(match.group())
+        unit: re.Match | None = Collector.UNIT_PATTERN.match(str(text))
+        if unit:
+            value *= 1024 ** (Collector.UNITS.index(unit.group(1)) + 1)
+        return value
+
+    def __run(self) -> None:
+        deadline: float = monotonic()
+        while not self.stopping.is_set():
+            deadline += self.interval
+            if self.stopping.wait(max(0.0, deadline - monotonic())):
+                return
+            self.collect()
+            if monotonic() > deadline + self.interval:
+                deadline = monotonic()
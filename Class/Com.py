@@ -1,15 +1,31 @@
 #!/usr/bin/env python3
 
+import queue
+import threading
+from collections import deque
+from time import monotonic
+
+import numpy as np
 import serial
 import serial.serialutil
 import serial.tools.list_ports
 
 from .Logger import logger
+from .Telemetry import Telemetry
 
 
 class Com:
     """
         Com port communication
+
+        Any object with the serial.Serial write/isOpen/close interface can be given as transport
+
+        The serial connection is opened once and written by a single writer thread
+        consuming an ordered queue of transactions. The writer packs the header and payload
+        of a transaction into one preallocated buffer and writes it in chunk_size slices,
+        payload arrays are sent asynchronously and must not be modified afterwards.
+        A failed write stops the writing, the error is raised by the next SendReg, flush or check
+        so the owner can close the port and open it again
     """
 
     RESET: int = 101
@@ -27,16 +43,45 @@ class Com:
         '/dev/ttyACM0',  # Linux port default
         'COM3'  # Windows port default
     ]
+    STATS_WINDOW: float = 5.0
+    HEADER_SIZE: int = 6
+    USB_PACKET_SIZE: int = 64
 
-    def __init__(self, config: dict):
-        if 'com_port' in config:
-            port: str  | None = config.get('com_port', self.COM_PORT[0])
-            logger.info('Using port from configuration ' + str(port))
+    def __init__(self, config: dict, transport: serial.Serial | None = None, telemetry: Telemetry | None = None):
+        if transport is not None:
+            self.serial: serial.Serial = transport
+            logger.info('Using transport ' + type(transport).__name__)
         else:
-            port: str  | None = self.auto_detect_com_port()
-            logger.info('Auto discovery found ' + str(port))
-        self.serial: serial.Serial = serial.Serial(
-            port, 115200, timeout=1, rtscts=1)
+            if 'com_port' in config:
+                port: str  | None = config.get('com_port', self.COM_PORT[0])
+                logger.info('Using port from configuration ' + str(port))
+            else:
+                port: str  | None = self.auto_detect_com_port()
+                logger.info('Auto discovery found ' + str(port))
+            self.serial: serial.Serial = serial.Serial(
+                port, 115200, timeout=1, rtscts=1)
+        if not self.serial.isOpen():
+            raise serial.SerialException(
+                'Port ' + str(getattr(self.serial, 'port', None)) + ' is not open')
+        self.error: serial.SerialException | None = None
+        self.chunk_size: int = self.__chunkSize(config.get('com_chunk_size', 4096))
+        self.buffer: bytearray = bytearray()
+        self.view: memoryview = memoryview(self.buffer)
+        self.pixels: np.ndarray = np.empty(0, dtype='<u2')
+        self.chunks: list[memoryview] = []
+        self.__reserve(self.HEADER_SIZE + config.get('display_width', 320) *
+                       config.get('display_height', 480) * 2)
+        self.queue: queue.Queue = queue.Queue(config.get('com_queue_size', 64))
+        self.bytes_written: int = 0
+        self.transactions: int = 0
+        self.history: deque = deque()
+        self.stats_lock: threading.Lock = threading.Lock()
+        self.telemetry: Telemetry | None = telemetry
+        if telemetry:
+            telemetry.addSource('com', self.stats, 'device', config.get('device', ''))
+        self.writer: threading.Thread = threading.Thread(
+            name='com-writer', target=self.__writerLoop, daemon=True)
+        self.writer.start()
         self.ScreenOn()
         self.SetBrightness(self.BRIGHTNESS_LEVEL.get(
             config.get('screen_brightness', 0), 0))
@@ -49,23 +94,156 @@ class Com:
             if port.device in self.COM_PORT:
                 return port.device
 
-    def SendReg(self, cmd: int, x: int, y: int, ex: int, ey: int) -> None:
+    def SendReg(self, cmd: int, x: int, y: int, ex: int, ey: int, payload: bytes | memoryview | np.ndarray | None = None) -> None:
         """
             Send command to hardware
+
+            The payload (pixel data, an RGB565 array or bytes) is written right after the header,
+            in the same contiguous write
+        """
+        self.check()
+        self.queue.put((cmd, x, y, ex, ey, payload))
+
+    def flush(self) -> None:
+        """
+            Wait for every queued transaction to be written
+        """
+        self.queue.join()
+        self.check()
+
+    def check(self) -> None:
+        """
+            Raise the error that stopped the writer, the panel was unplugged or the port failed
+        """
+        if self.error:
+            raise serial.SerialException('Serial write failed ' + str(self.error))
+
+    def discard(self) -> None:
+        """
+            Drop the queued transactions not being written yet, used before clearing the screen on exit
+        """
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.queue.task_done()
+
+    def close(self) -> None:
+        """
+            Write queued transactions, stop the writer and close the port
+        """
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        if self.serial.isOpen():
+            self.serial.close()
+
+    def stats(self) -> dict:
         """
-        byteBuffer: bytearray = bytearray(6)
-        byteBuffer[0] = (x >> 2)
-        byteBuffer[1] = (((x & 3) << 6) + (y >> 4))
-        byteBuffer[2] = (((y & 15) << 4) + (ex >> 6))
-        byteBuffer[3] = (((ex & 63) << 2) + (ey >> 8))
-        byteBuffer[4] = (ey & 255)
-        byteBuffer[5] = cmd
+            Get writer queue depth, throughput and write latency
+        """
+        with self.stats_lock:
+            self.__trimHistory(monotonic())
+            latencies: list[float] = [latency for _, _, latency in self.history]
+            window_bytes: int = sum(size for _, size, _ in self.history)
+            return {
+                'queue_depth': self.queue.qsize(),
+                'transactions': self.transactions,
+                'bytes_written': self.bytes_written,
+                'bytes_per_second': window_bytes / self.STATS_WINDOW,
+                'write_latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+                'write_latency_max': max(latencies, default=0.0)
+            }
+
+    def __writerLoop(self) -> None:
+        """
+            Write queued transactions in order
+        """
+        while True:
+            transaction: tuple | None = self.queue.get()
+            try:
+                if transaction is None:
+                    return
+                self.__write(*transaction)
+            finally:
+                self.queue.task_done()
+
+    def __write(self, cmd: int, x: int, y: int, ex: int, ey: int, payload: bytes | memoryview | np.ndarray | None) -> None:
+        """
+            Write a header and its payload, nothing once a write failed
+        """
+        if self.error:
+            return
+        start: float = monotonic()
+        size: int = self.__pack(cmd, x, y, ex, ey, payload)
+        full: int = size // self.chunk_size
         try:
-            self.serial.write(bytes(byteBuffer))
-        except serial.serialutil.PortNotOpenError:
-            logger.critical('Auto discovery of COM port failed')
-            logger.critical('Please use config.json to define com_port key as correct value or connect the device')
-            exit(128)
+            index: int
+            for index in range(full):
+                self.serial.write(self.chunks[index])
+            if size > full * self.chunk_size:
+                self.serial.write(self.view[full * self.chunk_size:size])
+        except serial.serialutil.SerialException as e:
+            logger.error('Serial write failed ' + str(e))
+            self.error = e
+            return
+        end: float = monotonic()
+        if self.telemetry:
+            self.telemetry.observe('serial_write_seconds', end - start)
+            self.telemetry.count('serial_bytes_total', size)
+        with self.stats_lock:
+            self.bytes_written += size
+            self.transactions += 1
+            self.history.append((end, size, end - start))
+            self.__trimHistory(end)
+
+    def __pack(self, cmd: int, x: int, y: int, ex: int, ey: int, payload: bytes | memoryview | np.ndarray | None) -> int:
+        """
+            Pack the header and payload of a transaction in the buffer, get the transaction size
+        """
+        size: int = self.HEADER_SIZE
+        if payload is not None:
+            size += payload.nbytes if isinstance(payload, (np.ndarray, memoryview)) else len(payload)
+            if size > len(self.buffer):
+                self.__reserve(size)
+        buffer: bytearray = self.buffer
+        buffer[0] = (x >> 2)
+        buffer[1] = (((x & 3) << 6) + (y >> 4))
+        buffer[2] = (((y & 15) << 4) + (ex >> 6))
+        buffer[3] = (((ex & 63) << 2) + (ey >> 8))
+        buffer[4] = (ey & 255)
+        buffer[5] = cmd
+        if isinstance(payload, np.ndarray):
+            np.copyto(self.pixels[:payload.size].reshape(payload.shape), payload)
+        elif payload is not None:
+            self.view[self.HEADER_SIZE:size] = payload
+        return size
+
+    def __reserve(self, size: int) -> None:
+        """
+            Allocate a transaction buffer of at least size bytes with its chunk views
+        """
+        size = -(-size // self.chunk_size) * self.chunk_size
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.pixels = np.frombuffer(self.buffer, dtype='<u2', offset=self.HEADER_SIZE,
+                                    count=(size - self.HEADER_SIZE) // 2)
+        self.chunks = [self.view[offset:offset + self.chunk_size]
+                       for offset in range(0, size, self.chunk_size)]
+
+    def __chunkSize(self, size: int) -> int:
+        """
+            Round the write size up to whole USB CDC packets
+        """
+        chunk_size: int = max(1, -(-size // self.USB_PACKET_SIZE)) * self.USB_PACKET_SIZE
+        if chunk_size != size:
+            logger.info('Serial chunk size rounded to ' + str(chunk_size))
+        return chunk_size
+
+    def __trimHistory(self, now: float) -> None:
+        while self.history and self.history[0][0] < now - self.STATS_WINDOW:
+            self.history.popleft()
 
     def Reset(self) -> None:
         """
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+from .Framebuffer import Framebuffer
+
+
+class Compositor:
+    """
+        Off-screen frame collecting every drawing of a tick
+
+        Touched regions are diffed against the shadow framebuffer and merged with a cost model
+        weighing the per transaction overhead against the extra pixels sent.
+        The frame is kept from one tick to the next and matches the framebuffer outside a tick,
+        only the touched regions are copied back when a tick ends
+    """
+
+    def __init__(self, framebuffer: Framebuffer, header_cost: int = 128) -> None:
+        self.framebuffer: Framebuffer = framebuffer
+        self.header_cost: int = header_cost
+        self.frame: np.ndarray = framebuffer.pixels.copy()
+        self.touched: list[tuple[int, int, int, int]] = []
+        self.active: bool = False
+
+    def begin(self) -> None:
+        """
+            Start collecting the drawings of a tick
+        """
+        self.touched.clear()
+        self.active = True
+
+    def end(self) -> None:
+        """
+            Stop collecting, the touched regions are copied back from the framebuffer
+            so regions that were not sent do not linger in the frame
+        """
+        x0: int
+        y0: int
+        x1: int
+        y1: int
+        for x0, y0, x1, y1 in self.__union(self.touched):
+            self.frame[y0:y1, x0:x1] = self.framebuffer.pixels[y0:y1, x0:x1]
+        self.touched.clear()
+        self.active = False
+
+    def sync(self, box: tuple[int, int, int, int]) -> None:
+        """
+            Copy a box of the framebuffer updated outside a tick to the frame
+        """
+        x0, y0, x1, y1 = box
+        self.frame[y0:y1, x0:x1] = self.framebuffer.pixels[y0:y1, x0:x1]
+
+    def draw(self, tile: np.ndarray, x: int, y: int) -> None:
+        """
+            Draw an RGB565 tile on the off-screen frame
+        """
+        height, width = tile.shape
+        self.frame[y:y + height, x:x + width] = tile
+        self.touched.append((x, y, x + width, y + height))
+
+    def regions(self) -> list[tuple[int, int, int, int]]:
+        """
+            Get the (x0, y0, x1, y1) screen regions to send, x1 and y1 excluded
+        """
+        rects: list[tuple[int, int, int, int]] = []
+        for x0, y0, x1, y1 in self.__union(self.touched):
+            for rx0, ry0, rx1, ry1 in self.framebuffer.diff(self.frame[y0:y1, x0:x1], x0, y0):
+                rects.append((x0 + rx0, y0 + ry0, x0 + rx1, y0 + ry1))
+        return self.__coalesce(rects)
+
+    def cost(self, rect: tuple[int, int, int, int]) -> int:
+        """
+            Get the cost in bytes of sending a region
+        """
+        return self.header_cost + (rect[2] - rect[0]) * (rect[3] - rect[1]) * 2
+
+    def __union(self, rects: list[tuple[int, int, int, int]]) -> list[tuple[int, int, int, int]]:
+        """
+            Merge overlapping rectangles so no region is diffed twice
+        """
+        merged: list[tuple[int, int, int, int]] = []
+        for rect in rects:
+            index: int = 0
+            while index < len(merged):
+                other: tuple[int, int, int, int] = merged[index]
+                if rect[0] < other[2] and other[0] < rect[2] and rect[1] < other[3] and other[1] < rect[3]:
+                    rect = self.__bound(rect, other)
+                    del merged[index]
+                    index = 0
+                else:
+                    index += 1
+            merged.append(rect)
+        return merged
+
+    def __coalesce(self, rects: list[tuple[int, int, int, int]]) -> list[tuple[int, int, int, int]]:
+        """
+            Merge regions while sending their bounding box is cheaper than sending them apart
+        """
+        while len(rects) > 1:
+            best: tuple[int, int, int] | None = None
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    saving: int = self.cost(rects[i]) + self.cost(rects[j]) - \
+                        self.cost(self.__bound(rects[i], rects[j]))
+                    if saving >= 0 and (best is None or saving > best[0]):
+                        best = (saving, i, j)
+            if best is None:
+                break
+            _, i, j = best
+            rects[i] = self.__bound(rects[i], rects[j])
+            del rects[j]
+        return rects
+
+    @staticmethod
+    def __bound(a: tuple[int, int, int, int], b: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+        return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
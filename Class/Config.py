@@ -18,10 +18,82 @@ class Config:
         'display_width': 320,
         'display_height': 480,
         'hot_reload_config': False,
-        'hot_reload_interval': 60,
+        'hot_reload_interval': 5,
+        'target_fps': 10,
+        'com_queue_size': 64,
+        'com_chunk_size': 4096,
         'dynamic_text_informations': [],
         'static_text_informations': [],
         'static_image': [],
+        'widgets': [],
+        'devices': [],
+        'emulator': {
+            'baudrate': 115200,
+            'rtscts': True,
+            'rx_buffer': 4096,
+            'process_rate': None,
+            'png': None
+        },
+        'telemetry': {
+            'enabled': False,
+            'host': '127.0.0.1',
+            'port': 9742,
+            'textfile': None,
+            'textfile_interval': 15
+        },
+        'hardware': {
+            'state_file': '.cache/hardware.json'
+        },
+        'metric_providers': {
+            'order': ['synthetic', 'proc', 'psutil', 'radeon', 'nvidia'],
+            'plugins': [],
+            'synthetic': {
+                'step': None,
+                'seed': 0,
+                'metrics': {}
+            },
+            'radeon': {
+                'gpu_id': 1
+            },
+            'nvidia': {
+                'gpu_id': 0
+            }
+        },
+        'collector': {
+            'interval_ms': 1000,
+            'history_size': 300
+        },
+        'framebuffer': {
+            'enabled': True,
+            'min_rect_size': 8,
+            'merge_threshold': 16
+        },
+        'animation': {
+            'memory_budget': 16777216
+        },
+        'compositor': {
+            'enabled': True,
+            'header_cost': 128
+        },
+        'text_cache': {
+            'enabled': True,
+            'memory_budget': 2097152
+        },
+        'asset_cache': {
+            'enabled': True,
+            'path': '.cache/assets/'
+        },
+        'render_pool': {
+            'enabled': False,
+            'workers': 2,
+            'slots': 32,
+            'slot_size': 65536,
+            'timeout_ms': 1000
+        },
+        'glyph_atlas': {
+            'enabled': True,
+            'charset': '0123456789 .,:;+-/%°[]CGMKTPEBWhzatsn'
+        },
         'debug': {
             'show': False,
             'x': 245,
@@ -32,8 +104,9 @@ class Config:
         }
     }
 
-    def __init__(self, path: str = 'config/config.json') -> None:
+    def __init__(self, path: str = 'config/config.json', device: str | None = None) -> None:
         self.path: str = path
+        self.device: str | None = device
         self.config: dict = {}
 
     def load(self) -> dict:
@@ -52,6 +125,31 @@ class Config:
         logger.info('Get theme')
         return self.config.get('assets_dir', 'assets/') + 'themes/' + self.config.get('theme', 'dark') + '.png'
 
+    def getDevices(self) -> list['Config']:
+        """
+            Get the configuration of every panel of the devices list, this configuration alone if there is none
+        """
+        devices: list[Config] = [self.getDevice(name)
+                                 for named_item in self.config.get('devices', [])
+                                 for name in named_item]
+        return devices or [self]
+
+    def getDevice(self, name: str) -> 'Config | None':
+        """
+            Get the configuration of a panel, its keys (com_port, theme, layout lists, screen_brightness...)
+            override the top-level ones
+        """
+        named_item: dict
+        for named_item in self.config.get('devices', []):
+            if name in named_item:
+                configuration: Config = Config(self.path, name)
+                configuration.config = {key: value for key, value in self.config.items()
+                                        if key != 'devices'}
+                configuration.config.update(named_item[name])
+                configuration.config['device'] = name
+                return configuration
+        return None
+
     def getKey(self, key: str, node: Iterable | None = None):
         """
             Get configuration value from key
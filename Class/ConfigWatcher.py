@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+
+from .Config import Config
+from .Logger import logger
+
+
+class ConfigWatcher:
+    """
+        Watch the configuration file for changes
+
+        The file mtime and size are polled, a changed file is parsed in the background
+        and handed over with poll() so it can be applied between frames
+    """
+
+    def __init__(self, path: str, interval: float = 5) -> None:
+        self.path: str = path
+        self.interval: float = interval
+        self.signature: tuple[int, int] | None = self.__stat()
+        self.pending: Config | None = None
+        self.lock: threading.Lock = threading.Lock()
+        self.stopping: threading.Event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+            Start watching in the background
+        """
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(
+            name='config-watcher', target=self.__run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+            Stop watching
+        """
+        self.stopping.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def poll(self) -> Config | None:
+        """
+            Get the configuration loaded since the last poll, if the file changed
+        """
+        with self.lock:
+            configuration: Config | None = self.pending
+            self.pending = None
+        return configuration
+
+    def check(self) -> bool:
+        """
+            Load the configuration if the file changed since the last check
+        """
+        signature: tuple[int, int] | None = self.__stat()
+        if signature is None or signature == self.signature:
+            return False
+        self.signature = signature
+        configuration: Config = Config(self.path)
+        try:
+            configuration.load()
+        except (OSError, ValueError) as e:
+            logger.error('Configuration reload failed ' + str(e))
+            return False
+        with self.lock:
+            self.pending = configuration
+        return True
+
+    def __run(self) -> None:
+        while not self.stopping.wait(self.interval):
+            self.check()
+
+    def __stat(self) -> tuple[int, int] | None:
+        try:
+            stat: os.stat_result = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+import threading
+
+from .AssetCache import AssetCache
+from .Collector import Collector
+from .Com import Com
+from .Config import Config
+from .Display import Display
+from .Emulator import Emulator
+from .Logger import logger
+from .RenderPool import RenderPool
+from .Scheduler import Scheduler
+from .Signal import Signal
+from .Telemetry import Telemetry
+
+
+class Device:
+    """
+        One panel of a multi-panel configuration
+
+        Each device runs its own serial writer, display and scheduler in its own thread while
+        the metric collector, the asset cache and the render pool are shared, so a slow panel only slows its own frames.
+        A panel that can not be opened or whose scheduler fails is retried in the background
+    """
+
+    RETRY_INTERVAL: float = 5.0
+
+    def __init__(self, configuration: Config, collector: Collector, telemetry: Telemetry | None = None, signal: Signal | None = None, render_pool: RenderPool | None = None, asset_cache: AssetCache | None = None) -> None:
+        self.configuration: Config = configuration
+        self.config: dict = configuration.config
+        self.name: str = configuration.device or 'default'
+        self.collector: Collector = collector
+        self.telemetry: Telemetry | None = telemetry
+        self.render_pool: RenderPool | None = render_pool
+        self.asset_cache: AssetCache | None = asset_cache
+        self.com: Com | None = None
+        self.display: Display | None = None
+        self.scheduler: Scheduler | None = None
+        self.error: str = ''
+        self.stopping: threading.Event = threading.Event()
+        self.thread: threading.Thread | None = None
+        if telemetry:
+            telemetry.addSource('device', self.stats, 'device', self.name)
+        if signal:
+            signal.add(self.interrupt)
+
+    def start(self, params: dict) -> None:
+        """
+            Open the panel and run its scheduler with params in the background, see Scheduler.run
+        """
+        self.thread = threading.Thread(
+            name='device-' + self.name, target=self.__run, args=(params,), daemon=True)
+        self.thread.start()
+
+    def interrupt(self) -> None:
+        """
+            Ask the device thread to stop, safe to call from a signal handler
+        """
+        self.stopping.set()
+        scheduler: Scheduler | None = self.scheduler
+        if scheduler:
+            scheduler.interrupt()
+
+    def stop(self) -> None:
+        """
+            Stop the scheduler and wait for the device thread to clear the screen and close the port
+        """
+        self.interrupt()
+        if self.thread:
+            self.thread.join()
+
+    def isAlive(self) -> bool:
+        """
+            Check if the device thread is still running
+        """
+        return self.thread is not None and self.thread.is_alive()
+
+    def stats(self) -> dict:
+        """
+            Get the connection state, frame pacing and serial throughput of the panel
+        """
+        stats: dict = {
+            'connected': self.com is not None,
+            'error': self.error
+        }
+        if self.scheduler:
+            stats.update(self.scheduler.stats())
+        if self.com:
+            stats.update(self.com.stats())
+        return stats
+
+    def __run(self, params: dict) -> None:
+        while not self.stopping.is_set():
+            if not self.__open():
+                self.stopping.wait(self.RETRY_INTERVAL)
+                continue
+            try:
+                if not self.stopping.is_set():
+                    self.scheduler.run(params)
+            except Exception as e:
+                logger.error('Device ' + self.name + ' failed, restarting ' + repr(e))
+                self.error = str(e)
+            finally:
+                self.scheduler.stop()
+                self.__close(self.stopping.is_set())
+            self.stopping.wait(self.RETRY_INTERVAL)
+
+    def __open(self) -> bool:
+        """
+            Open the serial port and build the pipeline of the panel
+        """
+        transport: Emulator | None = None
+        try:
+            if self.config.get('com_port') == 'emulator':
+                transport = Emulator.fromConfig(self.config)
+            com: Com = Com(self.config, transport, self.telemetry)
+        except OSError as e:
+            if str(e) != self.error:
+                logger.error('Device ' + self.name + ' unavailable ' + str(e))
+            self.error = str(e)
+            return False
+        logger.info('Device ' + self.name + ' opened')
+        self.error = ''
+        self.display = Display(com, com.serial, self.config,
+                               self.telemetry, self.render_pool, self.asset_cache)
+        self.scheduler = Scheduler(self.configuration, self.configuration.getTheme(),
+                                   self.display, com, self.telemetry, self.collector)
+        self.com = com
+        return True
+
+    def __close(self, clear: bool) -> None:
+        """
+            Close the serial port, clearing and turning off the screen first when the device stops
+        """
+        com: Com | None = self.com
+        self.com = None
+        self.scheduler = None
+        self.display = None
+        if com:
+            if clear and not com.error:
+                com.discard()
+                com.Clear()
+                com.ScreenOff()
+            com.close()
@@ -1,12 +1,31 @@
 #!/usr/bin/env python3
 
-import struct
+import os
+import threading
+from collections import OrderedDict
+from time import perf_counter
 
+import numpy as np
 import serial
-from PIL import Image, ImageDraw, ImageFont, PyAccess
+from PIL import Image, ImageDraw, ImageFont
 
+from .Animation import Animation
+from .AnimationPlayer import AnimationPlayer
+from .AssetCache import AssetCache
+from .BackgroundLayer import BackgroundLayer
 from .Com import Com
+from .Compositor import Compositor
+from .FontPool import FontPool
+from .Framebuffer import Framebuffer
+from .GlyphAtlas import GlyphAtlas
 from .Logger import logger
+from .RenderPool import RenderPool
+from .Rgb565 import Rgb565
+from .Telemetry import Telemetry
+from .Sparkline import Sparkline
+from .TextCache import TextCache
+from .Widget import Widget
+from .WidgetPlan import WidgetPlan
 
 
 class Display:
@@ -31,12 +50,50 @@ class Display:
         'y': 0
     }
 
-    def __init__(self, com: Com, ser: serial.Serial, config: dict) -> None:
+    WIDGET_CACHE_SIZE: int = 64
+
+    def __init__(self, com: Com, ser: serial.Serial, config: dict, telemetry: Telemetry | None = None, render_pool: RenderPool | None = None, asset_cache: AssetCache | None = None) -> None:
+        """
+            Give a render pool to rasterize FreeType text in worker processes and an asset cache,
+            both can be shared by several displays. The asset cache is built from the configuration when not given
+        """
         self.com: Com = com
+        self.telemetry: Telemetry | None = telemetry
+        self.render_pool: RenderPool | None = render_pool
         self.serial: serial.Serial = ser
         self.config: dict = config
         self.DISPLAY_WIDTH: int = config.get('display_width', 320)
         self.DISPLAY_HEIGHT: int = config.get('display_height', 480)
+        framebuffer_conf: dict = config.get('framebuffer', {})
+        self.framebuffer: Framebuffer | None = None
+        if framebuffer_conf.get('enabled', True):
+            self.framebuffer = Framebuffer(
+                self.DISPLAY_WIDTH, self.DISPLAY_HEIGHT,
+                framebuffer_conf.get('min_rect_size', 8),
+                framebuffer_conf.get('merge_threshold', 16))
+        compositor_conf: dict = config.get('compositor', {})
+        self.compositor: Compositor | None = None
+        if self.framebuffer and compositor_conf.get('enabled', True):
+            self.compositor = Compositor(
+                self.framebuffer, compositor_conf.get('header_cost', 128))
+        self.lock: threading.RLock = threading.RLock()
+        self.animations: OrderedDict[str, Animation] = OrderedDict()
+        self.players: list[AnimationPlayer] = []
+        self.fonts: FontPool = FontPool(
+            config.get('assets_dir', 'assets/') + 'fonts/')
+        self.atlases: dict[tuple[str, int], GlyphAtlas] = {}
+        self.backgrounds: dict[str, BackgroundLayer] = {}
+        self.widgets: OrderedDict[WidgetPlan, Widget | Sparkline] = OrderedDict()
+        self.asset_cache: AssetCache | None = asset_cache or AssetCache.fromConfig(
+            config)
+        text_cache_conf: dict = config.get('text_cache', {})
+        self.text_cache: TextCache | None = None
+        if text_cache_conf.get('enabled', True):
+            self.text_cache = TextCache(
+                text_cache_conf.get('memory_budget', 2097152))
+            if telemetry:
+                telemetry.addSource('text_cache', self.text_cache.stats,
+                                    'device', config.get('device', ''))
 
     def displayPILImage(self, image: Image.Image, x: int, y: int, gif: bool = False) -> None:
         """
@@ -50,47 +107,163 @@ class Display:
         assert image_height > 0, 'Image width must be > 0'
         assert image_width > 0, 'Image height must be > 0'
 
-        self.com.SendReg(self.com.DISPLAY_BITMAP, x, y, x +
-                         image_width - 1, y + image_height - 1)
+        if not gif:
+            start: float = perf_counter()
+            pixels: np.ndarray = Rgb565.fromImage(image)
+            if self.telemetry:
+                self.telemetry.observe(
+                    'rgb565_convert_seconds', perf_counter() - start)
+            self.displayRGB565(pixels, x, y)
+            return
+
+        self.playAnimation(Animation.fromImage(
+            image, self.__animationBudget()), x, y)
+
+    def displayRGB565(self, pixels: np.ndarray, x: int, y: int, element: str = 'other') -> None:
+        """
+            Display an RGB565 array
+
+            Only the rectangles that differ from the screen are sent when the shadow framebuffer is enabled,
+            inside a frame the array is drawn on the compositor and sent by endFrame.
+            Regions are sent asynchronously, the array must not be modified afterwards.
+            The array is clipped to the display, nothing is sent for an array fully off-screen.
+            Sent bytes are counted for the element name when telemetry is enabled
+        """
+        pixels, x, y = self.__clip(pixels, x, y)
+        if pixels.size == 0:
+            return
+        with self.lock:
+            if self.compositor and self.compositor.active:
+                if self.telemetry:
+                    height, width = pixels.shape
+                    self.telemetry.count('element_bytes_total', 2 * int(np.count_nonzero(
+                        self.compositor.frame[y:y + height, x:x + width] != pixels)), 'element', element)
+                self.compositor.draw(pixels, x, y)
+                return
+            if not self.framebuffer:
+                self.__sendRegion(pixels, x, y, element)
+                return
+            x0: int
+            y0: int
+            x1: int
+            y1: int
+            for x0, y0, x1, y1 in self.framebuffer.diff(pixels, x, y):
+                self.__sendRegion(
+                    pixels[y0:y1, x0:x1], x + x0, y + y0, element)
+            self.framebuffer.update(pixels, x, y)
+            if self.compositor:
+                height, width = pixels.shape
+                self.compositor.sync((x, y, x + width, y + height))
+
+    def __clip(self, pixels: np.ndarray, x: int, y: int) -> tuple[np.ndarray, int, int]:
+        """
+            Get the view of an RGB565 array inside the display and its position
+        """
+        height, width = pixels.shape
+        x0: int = max(x, 0)
+        y0: int = max(y, 0)
+        x1: int = max(min(x + width, self.DISPLAY_WIDTH), x0)
+        y1: int = max(min(y + height, self.DISPLAY_HEIGHT), y0)
+        return pixels[y0 - y:y1 - y, x0 - x:x1 - x], x0, y0
+
+    def playAnimation(self, animation: Animation, x: int, y: int, loop: int | None = None) -> AnimationPlayer:
+        """
+            Play an animation in the background, frames are diffed against the screen like any other drawing
+        """
+        player: AnimationPlayer = AnimationPlayer(
+            animation, self.displayRGB565, x, y, loop)
+        self.players = [player for player in self.players if player.isPlaying()]
+        self.players.append(player)
+        player.start()
+        return player
+
+    def stopAnimations(self) -> None:
+        """
+            Stop every animation
+        """
+        player: AnimationPlayer
+        for player in self.players:
+            player.stop()
+        self.players = []
+
+    def loadAnimation(self, path: str | list[str], frame_duration: float = Animation.DEFAULT_DURATION) -> Animation:
+        """
+            Get an animation from a GIF path or a list of image paths, decoded once and kept within the memory budget
+        """
+        key: str = path if isinstance(path, str) else os.pathsep.join(path)
+        animation: Animation | None = self.animations.get(key)
+        if animation is not None:
+            self.animations.move_to_end(key)
+            return animation
+        memory_budget: int = self.__animationBudget()
+        if isinstance(path, str):
+            with Image.open(path) as image:
+                animation = Animation.fromImage(image, memory_budget)
+        else:
+            animation = Animation.fromFiles(path, frame_duration, memory_budget)
+        self.animations[key] = animation
+        while sum(cached.nbytes for cached in self.animations.values()) > memory_budget and len(self.animations) > 1:
+            self.animations.popitem(last=False)
+        return animation
+
+    def __animationBudget(self) -> int:
+        return self.config.get('animation', {}).get('memory_budget', 16777216)
+
+    def beginFrame(self) -> None:
+        """
+            Start batching drawings in an off-screen frame
+        """
+        if self.compositor:
+            with self.lock:
+                self.compositor.begin()
+
+    def endFrame(self) -> None:
+        """
+            Send the regions of the frame that changed in as few transactions as possible
 
-        frames: int = 1
-        if gif:
-            frames = image.n_frames
-        for frame in range(0, frames):
+            The regions are copied out of the frame, the next tick draws on it while they are written
+        """
+        with self.lock:
+            compositor: Compositor | None = self.compositor
+            if compositor is None or not compositor.active:
+                return
             try:
-                if gif:
-                    image.seek(frame+1)
-                pix: PyAccess.PyAccess = image.load()
-                line: bytes = bytes()
-                for h in range(image_height):
-                    for w in range(image_width):
-                        R: int = pix[w, h][0] >> 3
-                        G: int = pix[w, h][1] >> 2
-                        B: int = pix[w, h][2] >> 3
-
-                        rgb: int = (R << 11) | (G << 5) | B
-                        line += struct.pack('H', rgb)
-
-                        # Send image data by multiple of DISPLAY_WIDTH bytes
-                        if len(line) >= self.DISPLAY_WIDTH * 8:
-                            self.serial.write(line)
-                            line = bytes()
-                # Write last line if needed
-                if len(line) > 0:
-                    self.serial.write(line)
-            except EOFError:
-                pass  # end of sequence gif
+                x0: int
+                y0: int
+                x1: int
+                y1: int
+                for x0, y0, x1, y1 in compositor.regions():
+                    region: np.ndarray = compositor.frame[y0:y1, x0:x1].copy()
+                    self.__sendRegion(region, x0, y0)
+                    self.framebuffer.update(region, x0, y0)
+            finally:
+                compositor.end()
+
+    def __sendRegion(self, pixels: np.ndarray, x: int, y: int, element: str | None = None) -> None:
+        """
+            Send an RGB565 region to the screen
+
+            The array is handed to the writer as is and copied once into its transmit buffer
+        """
+        height, width = pixels.shape
+        self.com.SendReg(self.com.DISPLAY_BITMAP, x, y,
+                         x + width - 1, y + height - 1, pixels)
+        if self.telemetry and element:
+            self.telemetry.count(
+                'element_bytes_total', pixels.nbytes, 'element', element)
 
     def displayBitmap(self, bitmap_path: str, x: int, y: int) -> None:
         """
             Display bitmap on 0/0 by default
         """
-        image: Image.Image = Image.open(bitmap_path)
-        self.displayPILImage(
-            image, x, y, True if ".gif" in bitmap_path else False)
+        if ".gif" in bitmap_path:
+            self.playAnimation(self.loadAnimation(bitmap_path), x, y)
+        else:
+            self.displayRGB565(self.getBackground(bitmap_path).rgb565,
+                               x, y, os.path.basename(bitmap_path))
         logger.info('Display bitmap ' + bitmap_path + ' on x ' + str(x) + ' y ' + str(y))
 
-    def displayText(self, text: str, x: int, y: int, font_path: str, font_size: int, font_color: tuple, background_color: tuple, background_image: str | None) -> None:
+    def displayText(self, text: str, x: int, y: int, font_path: str, font_size: int, font_color: tuple, background_color: tuple, background_image: str | None, element: str = 'text') -> None:
         """
         Convert text to bitmap using PIL and display it
 
@@ -99,24 +272,168 @@ class Display:
         assert len(text) > 0, 'Text must not be empty'
         assert font_size > 0, "Font size must be > 0"
 
+        key: tuple = (text, x, y, font_path, font_size, tuple(font_color),
+                      tuple(background_color), background_image)
+        tile: np.ndarray | None = None
+        if self.text_cache:
+            tile = self.text_cache.get(key)
+        if tile is None:
+            atlas: GlyphAtlas | None = self.__getAtlas(font_path, font_size)
+            if atlas and not atlas.covers(text):
+                atlas = None
+            box: tuple = self.__textBox(text, x, y, font_path, font_size, atlas)
+            if atlas:
+                tile = self.__renderAtlasText(atlas, text, box, font_color,
+                                              background_color, background_image)
+            else:
+                if self.render_pool:
+                    tile = self.__renderPooledText(text, box, font_path, font_size,
+                                                   font_color, background_color, background_image)
+                if tile is None:
+                    tile = self.__renderText(text, box, font_path, font_size,
+                                             font_color, background_color, background_image)
+            if self.text_cache:
+                # pooled tiles are read-only views of a shared slot, the slot is freed once sent
+                self.text_cache.put(key, tile if tile.flags.writeable else tile.copy())
+
+        self.displayRGB565(tile, x, y, element)
+
+    def textBox(self, text: str, x: int, y: int, font_path: str, font_size: int) -> tuple:
+        """
+            Get the (x0, y0, x1, y1) screen box covered by displayText
+        """
+        atlas: GlyphAtlas | None = self.__getAtlas(font_path, font_size)
+        if atlas and not atlas.covers(text):
+            atlas = None
+        return self.__textBox(text, x, y, font_path, font_size, atlas)
+
+    def restoreBackground(self, box: tuple, background_image: str) -> None:
+        """
+            Display the background image back over the box
+
+            Widgets under the box are drawn in full on their next update
+        """
+        with self.lock:
+            plan: WidgetPlan
+            for plan, widget in self.widgets.items():
+                x0, y0, x1, y1 = plan.box
+                if x0 < box[2] and box[0] < x1 and y0 < box[3] and box[1] < y1:
+                    widget.invalidate()
+            self.displayRGB565(self.getBackground(
+                background_image).crop565(box), box[0], box[1])
+
+    def __textBox(self, text: str, x: int, y: int, font_path: str, font_size: int, atlas: GlyphAtlas | None) -> tuple:
+        if atlas:
+            text_width, text_height = atlas.measure(text)
+        else:
+            font: ImageFont.FreeTypeFont = self.fonts.get(font_path, font_size)
+            ascent, descent = font.getmetrics()
+            mask_bbox: tuple = font.getmask(text).getbbox()
+            text_width = mask_bbox[2] + (ascent - 7)
+            text_height = mask_bbox[3] + descent
+        return (x, y, min(x + text_width, self.DISPLAY_WIDTH),
+                min(y + text_height, self.DISPLAY_HEIGHT))
+
+    def __renderText(self, text: str, box: tuple, font_path: str, font_size: int, font_color: tuple, background_color: tuple, background_image: str | None) -> np.ndarray:
+        """
+            Render text to an RGB565 tile using PIL
+        """
+        font: ImageFont.FreeTypeFont = self.fonts.get(font_path, font_size)
+        x, y = box[:2]
         if background_image is None:
             text_image: Image.Image = Image.new(
-                'RGB', (self.DISPLAY_WIDTH, self.DISPLAY_HEIGHT), background_color)
+                'RGB', (box[2] - x, box[3] - y), tuple(background_color))
         else:
-            text_image: Image.Image = Image.open(background_image)
+            text_image: Image.Image = self.getBackground(
+                background_image).image(box)
 
-        font: ImageFont.FreeTypeFont = ImageFont.truetype(self.config.get(
-            'assets_dir', 'assets/') + 'fonts/' + font_path, font_size)
+        start: float = perf_counter()
         draw: ImageDraw.ImageDraw = ImageDraw.Draw(text_image)
-        draw.text((x, y), text, font=font, fill=font_color)
+        draw.text((0, 0), text, font=font, fill=font_color)
+        rendered: float = perf_counter()
+        tile: np.ndarray = Rgb565.fromImage(text_image)
+        if self.telemetry:
+            self.telemetry.observe(
+                'text_render_seconds', rendered - start, 'renderer', 'pil')
+            self.telemetry.observe(
+                'rgb565_convert_seconds', perf_counter() - rendered)
+        return tile
+
+    def __renderPooledText(self, text: str, box: tuple, font_path: str, font_size: int, font_color: tuple, background_color: tuple, background_image: str | None) -> np.ndarray | None:
+        """
+            Render text to a read-only RGB565 tile in the render pool, None if the pool failed
+        """
+        if background_image is not None:
+            self.getBackground(background_image)  # drop the tiles of a changed background
+        tile: np.ndarray | None = self.render_pool.renderText(
+            text, box, font_path, font_size, font_color, background_color, background_image)
+        if tile is None:
+            logger.warning('Render pool unavailable, rendering ' + text + ' in process')
+        return tile
+
+    def __renderAtlasText(self, atlas: GlyphAtlas, text: str, box: tuple, font_color: tuple, background_color: tuple, background_image: str | None) -> np.ndarray:
+        """
+            Render text to an RGB565 tile by blitting pre-rasterized glyphs
+        """
+        x, y = box[:2]
+        if background_image is None:
+            background: np.ndarray = np.empty(
+                (box[3] - y, box[2] - x, 3), dtype=np.uint8)
+            background[...] = background_color
+        else:
+            background: np.ndarray = self.getBackground(
+                background_image).crop(box)
+        start: float = perf_counter()
+        rgb: np.ndarray = atlas.draw(text, background, font_color)
+        rendered: float = perf_counter()
+        tile: np.ndarray = Rgb565.fromArray(rgb)
+        if self.telemetry:
+            self.telemetry.observe(
+                'text_render_seconds', rendered - start, 'renderer', 'atlas')
+            self.telemetry.observe(
+                'rgb565_convert_seconds', perf_counter() - rendered)
+        return tile
+
+    def getBackground(self, path: str) -> BackgroundLayer:
+        """
+            Get the decoded background, decoding it again only if the file changed
+        """
+        with self.lock:
+            layer: BackgroundLayer | None = self.backgrounds.get(path)
+            if layer is None or layer.isStale():
+                if layer is not None:
+                    logger.info('Background ' + path + ' changed')
+                    if self.text_cache:
+                        self.text_cache.clear()
+                    self.widgets.clear()
+                layer = BackgroundLayer(path, self.asset_cache)
+                self.backgrounds[path] = layer
+            return layer
 
-        ascent, descent = font.getmetrics()
-        text_width = font.getmask(text).getbbox()[2] + (ascent - 7)
-        text_height = font.getmask(text).getbbox()[3] + descent
-        text_image = text_image.crop(box=(x, y, min(
-            x + text_width, self.DISPLAY_WIDTH), min(y + text_height, self.DISPLAY_HEIGHT)))
+    def invalidateBackgrounds(self) -> None:
+        """
+            Drop decoded backgrounds and the text and widgets rendered over them, used when the theme changes
+        """
+        with self.lock:
+            self.backgrounds.clear()
+            self.widgets.clear()
+            if self.text_cache:
+                self.text_cache.clear()
 
-        self.displayPILImage(text_image, x, y)
+    def __getAtlas(self, font_path: str, font_size: int) -> GlyphAtlas | None:
+        """
+            Get the glyph atlas of the font, built on first use
+        """
+        atlas_conf: dict = self.config.get('glyph_atlas', {})
+        if not atlas_conf.get('enabled', True):
+            return None
+        key: tuple[str, int] = (font_path, font_size)
+        atlas: GlyphAtlas | None = self.atlases.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(self.fonts.get(font_path, font_size),
+                               atlas_conf.get('charset', GlyphAtlas.DEFAULT_CHARSET))
+            self.atlases[key] = atlas
+        return atlas
 
     def displayProgressBar(self, x: int, y: int, width: int, height: int, min_value=0, max_value=100,
                            value=50,
@@ -134,26 +451,76 @@ class Display:
         assert y + height <= self.DISPLAY_HEIGHT, 'Progress bar height exceeds display height'
         assert min_value <= value <= max_value, 'Progress bar value shall be between min and max'
 
-        if len(background_image) <= 0:
-            bar_image: Image.Image = Image.new(
-                'RGB', (width, height), background_color)
+        self.displayWidget(WidgetPlan.fromElement('progress_bar', {
+            'x': x,
+            'y': y,
+            'width': width,
+            'height': height,
+            'min_value': min_value,
+            'max_value': max_value,
+            'color': bar_color,
+            'outline': bar_outline,
+            'background_color': background_color,
+            'background_image': background_image or None
+        }, None, None), value)
+
+    def displayWidget(self, plan: WidgetPlan, value: float) -> None:
+        """
+            Display a bar, level meter or ring gauge
+
+            The widget is rendered in full on first display,
+            afterwards only the span between the previous and the new value is sent
+        """
+        with self.lock:
+            widget: Widget = self.__getWidget(plan, Widget)
+            update: tuple[np.ndarray, int, int] | None = widget.update(value)
+            if update is not None:
+                self.displayRGB565(*update, plan.name)
+
+    def displaySparkline(self, plan: WidgetPlan, samples: list[tuple[float, float]]) -> None:
+        """
+            Display a history graph of (timestamp, value) samples
+
+            The graph is rendered in full on first display,
+            afterwards only the columns of the samples newer than the drawn ones are sent
+        """
+        with self.lock:
+            sparkline: Sparkline = self.__getWidget(plan, Sparkline)
+            tile: np.ndarray
+            x: int
+            y: int
+            for tile, x, y in sparkline.push(samples):
+                self.displayRGB565(tile, x, y, plan.name)
+
+    def forgetWidget(self, plan: WidgetPlan) -> None:
+        """
+            Drop the rendered widget, the next displayWidget of the plan draws it in full
+        """
+        with self.lock:
+            self.widgets.pop(plan, None)
+
+    def __getWidget(self, plan: WidgetPlan, kind: type) -> Widget | Sparkline:
+        """
+            Get the rendered widget of the plan, built over its background on first use
+        """
+        assert plan.x + plan.width <= self.DISPLAY_WIDTH, 'Widget width exceeds display width'
+        assert plan.y + plan.height <= self.DISPLAY_HEIGHT, 'Widget height exceeds display height'
+
+        widget: Widget | Sparkline | None = self.widgets.get(plan)
+        if widget is not None:
+            self.widgets.move_to_end(plan)
+            return widget
+        if plan.background_image:
+            background: np.ndarray = self.getBackground(
+                plan.background_image).crop565(plan.box)
         else:
-            bar_image: Image.Image = Image.open(background_image)
-            bar_image: Image.Image = bar_image.crop(
-                box=(x, y, x + width, y + height))
-
-        # Draw progress bar
-        bar_filled_width: float = value / (max_value - min_value) * width
-        draw: ImageDraw.ImageDraw = ImageDraw.Draw(bar_image)
-        draw.rectangle([0, 0, bar_filled_width-1, height-1],
-                       fill=bar_color, outline=bar_color)
-
-        if bar_outline:
-            # Draw outline
-            draw.rectangle([0, 0, width-1, height-1],
-                           fill=None, outline=bar_color)
-
-        self.displayPILImage(bar_image, x, y)
+            background: np.ndarray = np.full((plan.height, plan.width), Rgb565.fromColor(
+                plan.background_color), dtype=Rgb565.DTYPE)
+        widget = kind(plan, background)
+        self.widgets[plan] = widget
+        if len(self.widgets) > self.WIDGET_CACHE_SIZE:
+            self.widgets.popitem(last=False)
+        return widget
 
     def generateText(self, text: str, prefix: str = None) -> str:
         """
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+from time import monotonic, sleep
+
+import numpy as np
+from PIL import Image
+
+from .Com import Com
+from .Logger import logger
+
+
+class Emulator:
+    """
+        Emulated screen speaking the serial protocol
+
+        Used in place of serial.Serial, either in-process or behind a pty for another process.
+        Commands are decoded into an RGB565 framebuffer, the link speed and RTS/CTS
+        backpressure are simulated so writes take as long as on the real port
+    """
+
+    HEADER_SIZE: int = 6
+    BITS_PER_BYTE: int = 10  # 8N1, start and stop bits
+    COMMANDS: dict[int, str] = {
+        Com.RESET: 'reset',
+        Com.CLEAR: 'clear',
+        Com.SCREEN_OFF: 'screen_off',
+        Com.SCREEN_ON: 'screen_on',
+        Com.SET_BRIGHTNESS: 'set_brightness',
+        Com.DISPLAY_BITMAP: 'display_bitmap'
+    }
+
+    def __init__(self, width: int = 320, height: int = 480, baudrate: int | None = 115200, rtscts: bool = True,
+                 rx_buffer: int = 4096, process_rate: float | None = None, png: str | None = None) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.baudrate: int | None = baudrate
+        self.rtscts: bool = rtscts
+        self.rx_buffer: int = rx_buffer
+        self.process_rate: float | None = process_rate
+        self.png: str | None = png
+        self.is_open: bool = True
+        self.timeout: float | None = 1
+        self.lock: threading.Lock = threading.Lock()
+        self.framebuffer: np.ndarray = np.zeros((height, width), dtype='<u2')
+        self.screen_on: bool = False
+        self.brightness: int = 0
+        self.header: bytearray = bytearray()
+        self.region: tuple[int, int, int, int] | None = None
+        self.payload: bytearray = bytearray()
+        self.remaining: int = 0
+        self.sent_until: float = 0.0
+        self.processed_until: float = 0.0
+        self.bytes_received: int = 0
+        self.pixels: int = 0
+        self.overrun_bytes: int = 0
+        self.stall_time: float = 0.0
+        self.link_time: float = 0.0
+        self.commands: dict[str, int] = {}
+        self.pty_thread: threading.Thread | None = None
+        self.pty_master: int | None = None
+
+    @staticmethod
+    def fromConfig(config: dict) -> 'Emulator':
+        """
+            Build an emulator from the display size and the 'emulator' configuration
+        """
+        emulator_conf: dict = config.get('emulator', {})
+        return Emulator(
+            config.get('display_width', 320),
+            config.get('display_height', 480),
+            emulator_conf.get('baudrate', 115200),
+            emulator_conf.get('rtscts', True),
+            emulator_conf.get('rx_buffer', 4096),
+            emulator_conf.get('process_rate'),
+            emulator_conf.get('png'))
+
+    def isOpen(self) -> bool:
+        return self.is_open
+
+    def open(self) -> None:
+        self.is_open = True
+
+    def close(self) -> None:
+        """
+            Close the port, the framebuffer is saved to png if set
+        """
+        if self.is_open and self.png:
+            self.dump(self.png)
+        self.is_open = False
+        if self.pty_master is not None:
+            os.close(self.pty_master)
+            self.pty_master = None
+
+    def flush(self) -> None:
+        pass
+
+    def write(self, data: bytes | memoryview) -> int:
+        """
+            Receive bytes from the host, blocking for as long as the simulated link takes
+        """
+        size: int = len(data)
+        end: float = self.__transfer(size)
+        self.feed(data)
+        delay: float = end - monotonic()
+        if delay > 0:
+            sleep(delay)
+        return size
+
+    def feed(self, data: bytes | memoryview) -> None:
+        """
+            Decode received bytes, commands may span several writes
+        """
+        view: memoryview = memoryview(data).cast('B')
+        offset: int = 0
+        with self.lock:
+            self.bytes_received += len(view)
+            while offset < len(view):
+                if self.remaining > 0:
+                    size: int = min(self.remaining, len(view) - offset)
+                    self.payload += view[offset:offset + size]
+                    self.remaining -= size
+                    offset += size
+                    if self.remaining == 0:
+                        self.__blit()
+                    continue
+                size: int = min(self.HEADER_SIZE -
+                                len(self.header), len(view) - offset)
+                self.header += view[offset:offset + size]
+                offset += size
+                if len(self.header) == self.HEADER_SIZE:
+                    self.__command(bytes(self.header))
+                    self.header.clear()
+
+    def toImage(self) -> Image.Image:
+        """
+            Get the framebuffer as an RGB image
+        """
+        with self.lock:
+            pixels: np.ndarray = self.framebuffer.astype(np.uint16)
+        rgb: np.ndarray = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        red: np.ndarray = (pixels >> 11) & 0x1F
+        green: np.ndarray = (pixels >> 5) & 0x3F
+        blue: np.ndarray = pixels & 0x1F
+        rgb[..., 0] = (red << 3) | (red >> 2)
+        rgb[..., 1] = (green << 2) | (green >> 4)
+        rgb[..., 2] = (blue << 3) | (blue >> 2)
+        return Image.fromarray(rgb, 'RGB')
+
+    def dump(self, path: str) -> None:
+        """
+            Save the framebuffer as PNG, creating its directory
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.toImage().save(path, 'PNG')
+        logger.info('Emulator framebuffer saved to ' + path)
+
+    def stats(self) -> dict:
+        """
+            Get decoded commands, received bytes and simulated link timings
+        """
+        with self.lock:
+            return {
+                'bytes_received': self.bytes_received,
+                'pixels': self.pixels,
+                'commands': dict(self.commands),
+                'screen_on': self.screen_on,
+                'brightness': self.brightness,
+                'link_time': self.link_time,
+                'stall_time': self.stall_time,
+                'overrun_bytes': self.overrun_bytes
+            }
+
+    def openPty(self) -> str:
+        """
+            Serve the emulator behind a pseudo terminal, returns the device path to use as com_port
+
+            The pty is read at the simulated link speed, a writer outpacing it blocks on the full pty buffer.
+            POSIX only, pty and tty are imported here so the package still imports on Windows
+        """
+        import pty
+        import tty
+
+        master, slave = pty.openpty()
+        tty.setraw(master)
+        self.pty_master = master
+        self.pty_thread = threading.Thread(
+            name='emulator-pty', target=self.__ptyLoop, daemon=True)
+        self.pty_thread.start()
+        path: str = os.ttyname(slave)
+        logger.info('Emulator listening on ' + path)
+        return path
+
+    def __ptyLoop(self) -> None:
+        while self.pty_master is not None:
+            try:
+                data: bytes = os.read(self.pty_master, self.rx_buffer)
+            except OSError:
+                return
+            if not data:
+                return
+            self.write(data)
+
+    def __transfer(self, size: int) -> float:
+        """
+            Advance the simulated link by size bytes, returns when the host is done sending them
+
+            The device buffers rx_buffer bytes and processes them at process_rate,
+            with RTS/CTS the host stalls while that buffer is full, without it the excess is lost
+        """
+        if self.baudrate is None and self.process_rate is None:
+            return 0.0
+        now: float = monotonic()
+        start: float = max(now, self.sent_until)
+        link_end: float = start
+        if self.baudrate:
+            link_end += size * self.BITS_PER_BYTE / self.baudrate
+        end: float = link_end
+        if self.process_rate:
+            self.processed_until = max(
+                self.processed_until, start) + size / self.process_rate
+            drained: float = self.processed_until - self.rx_buffer / self.process_rate
+            if drained > link_end:
+                if self.rtscts:
+                    end = drained
+                    self.stall_time += drained - link_end
+                else:
+                    self.overrun_bytes += int((drained - link_end) * self.process_rate)
+        self.link_time += link_end - start
+        self.sent_until = end
+        return end
+
+    def __command(self, header: bytes) -> None:
+        x: int = (header[0] << 2) | (header[1] >> 6)
+        y: int = ((header[1] & 63) << 4) | (header[2] >> 4)
+        ex: int = ((header[2] & 15) << 6) | (header[3] >> 2)
+        ey: int = ((header[3] & 3) << 8) | header[4]
+        name: str = self.COMMANDS.get(header[5], 'unknown')
+        self.commands[name] = self.commands.get(name, 0) + 1
+        match header[5]:
+            case Com.RESET:
+                self.framebuffer[...] = 0
+                self.screen_on = False
+                self.brightness = 0
+            case Com.CLEAR:
+                self.framebuffer[...] = 0xFFFF
+            case Com.SCREEN_OFF:
+                self.screen_on = False
+            case Com.SCREEN_ON:
+                self.screen_on = True
+            case Com.SET_BRIGHTNESS:
+                self.brightness = x
+            case Com.DISPLAY_BITMAP:
+                if ex < x or ey < y:
+                    logger.warning('Emulator ignored empty region ' +
+                                   str((x, y, ex, ey)))
+                    return
+                self.region = (x, y, ex, ey)
+                self.payload = bytearray()
+                self.remaining = (ex - x + 1) * (ey - y + 1) * 2
+            case default:
+                logger.warning('Emulator received unknown command ' +
+                               str(header[5]))
+
+    def __blit(self) -> None:
+        x, y, ex, ey = self.region
+        pixels: np.ndarray = np.frombuffer(
+            self.payload, dtype='<u2').reshape(ey - y + 1, ex - x + 1)
+        if ex >= self.width or ey >= self.height:
+            logger.warning('Emulator clipped region ' +
+                           str(self.region) + ' to the screen')
+        if x < self.width and y < self.height:
+            self.framebuffer[y:ey + 1, x:ex + 1] = \
+                pixels[:self.height - y, :self.width - x]
+        self.pixels += pixels.size
+        self.region = None
+        self.payload = bytearray()
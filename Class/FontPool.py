@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import threading
+
+from PIL import ImageFont
+
+from .Logger import logger
+
+
+class FontPool:
+    """
+        Registry of loaded fonts
+
+        Each (font_path, font_size) pair is loaded once with FreeType
+    """
+
+    def __init__(self, fonts_dir: str = 'assets/fonts/') -> None:
+        self.fonts_dir: str = fonts_dir
+        self.fonts: dict[tuple[str, int], ImageFont.FreeTypeFont] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    def get(self, font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+        """
+            Get the font, loading it on first use
+        """
+        key: tuple[str, int] = (font_path, font_size)
+        font: ImageFont.FreeTypeFont | None = self.fonts.get(key)
+        if font is None:
+            with self.lock:
+                font = self.fonts.get(key)
+                if font is None:
+                    font = ImageFont.truetype(
+                        self.fonts_dir + font_path, font_size)
+                    self.fonts[key] = font
+                    logger.info('Load font ' + font_path +
+                                ' size ' + str(font_size))
+        return font
+
+    def clear(self) -> None:
+        """
+            Drop every loaded font
+        """
+        with self.lock:
+            self.fonts.clear()
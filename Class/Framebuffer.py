@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+from .Rgb565 import Rgb565
+
+
+class Framebuffer:
+    """
+        RGB565 shadow copy of what the screen shows
+
+        Used to diff an update against the screen and only send the changed rectangles
+    """
+
+    def __init__(self, width: int, height: int, min_rect_size: int = 8, merge_threshold: int = 16) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.min_rect_size: int = max(1, min_rect_size)
+        self.merge_threshold: int = max(0, merge_threshold)
+        self.pixels: np.ndarray = np.zeros((height, width), dtype=Rgb565.DTYPE)
+        self.known: np.ndarray = np.zeros((height, width), dtype=bool)
+
+    def invalidate(self, box: tuple | None = None) -> None:
+        """
+            Forget the screen content of the box (the whole screen by default)
+        """
+        if box is None:
+            self.known[:, :] = False
+        else:
+            x0, y0, x1, y1 = box
+            self.known[y0:y1, x0:x1] = False
+
+    def diff(self, tile: np.ndarray, x: int, y: int) -> list[tuple[int, int, int, int]]:
+        """
+            Get the rectangles of the tile that differ from the screen
+
+            Rectangles are (x0, y0, x1, y1) in tile coordinates, x1 and y1 excluded
+        """
+        height, width = tile.shape
+        changed: np.ndarray = (self.pixels[y:y + height, x:x + width] != tile) | ~self.known[y:y + height, x:x + width]
+        rects: list[tuple[int, int, int, int]] = []
+        for y0, y1 in self.__runs(changed.any(axis=1)):
+            band: np.ndarray = changed[y0:y1]
+            for x0, x1 in self.__runs(band.any(axis=0)):
+                rows: np.ndarray = np.flatnonzero(band[:, x0:x1].any(axis=1))
+                rects.append(self.__grow(
+                    (x0, y0 + int(rows[0]), x1, y0 + int(rows[-1]) + 1), width, height))
+        return self.__merge(rects)
+
+    def update(self, tile: np.ndarray, x: int, y: int) -> None:
+        """
+            Record the tile as shown on screen
+        """
+        height, width = tile.shape
+        self.pixels[y:y + height, x:x + width] = tile
+        self.known[y:y + height, x:x + width] = True
+
+    def __runs(self, flags: np.ndarray) -> list[tuple[int, int]]:
+        """
+            Get the [start, end) runs of set flags, joining runs separated by merge_threshold or less
+        """
+        runs: list[tuple[int, int]] = []
+        indexes: np.ndarray = np.flatnonzero(flags)
+        if len(indexes) == 0:
+            return runs
+        breaks: np.ndarray = np.flatnonzero(np.diff(indexes) > self.merge_threshold + 1)
+        starts: np.ndarray = np.concatenate(([indexes[0]], indexes[breaks + 1]))
+        ends: np.ndarray = np.concatenate((indexes[breaks], [indexes[-1]])) + 1
+        for start, end in zip(starts, ends):
+            runs.append((int(start), int(end)))
+        return runs
+
+    def __grow(self, rect: tuple[int, int, int, int], width: int, height: int) -> tuple[int, int, int, int]:
+        """
+            Grow the rectangle to min_rect_size, clipped to the tile
+        """
+        x0, y0, x1, y1 = rect
+        if x1 - x0 < self.min_rect_size:
+            x0 = max(0, min(x0, x1 - self.min_rect_size))
+            x1 = min(width, x0 + self.min_rect_size)
+        if y1 - y0 < self.min_rect_size:
+            y0 = max(0, min(y0, y1 - self.min_rect_size))
+            y1 = min(height, y0 + self.min_rect_size)
+        return (x0, y0, x1, y1)
+
+    def __merge(self, rects: list[tuple[int, int, int, int]]) -> list[tuple[int, int, int, int]]:
+        """
+            Merge rectangles closer than merge_threshold
+        """
+        gap: int = self.merge_threshold
+        merged: bool = True
+        while merged and len(rects) > 1:
+            merged = False
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    a, b = rects[i], rects[j]
+                    if a[0] - gap <= b[2] and b[0] - gap <= a[2] and a[1] - gap <= b[3] and b[1] - gap <= a[3]:
+                        rects[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                        del rects[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return rects
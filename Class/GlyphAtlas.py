@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+class GlyphAtlas:
+    """
+        Pre-rasterized glyphs of a font
+
+        Text made only of atlas characters is built by blitting the cached glyph masks,
+        placed with the glyph advances and the kerning of each pair of characters
+    """
+
+    DEFAULT_CHARSET: str = '0123456789 .,:;+-/%°[]CGMKTPEBWhzatsn'
+
+    def __init__(self, font: ImageFont.FreeTypeFont, charset: str = DEFAULT_CHARSET) -> None:
+        self.font: ImageFont.FreeTypeFont = font
+        self.ascent: int
+        self.descent: int
+        self.ascent, self.descent = font.getmetrics()
+        self.glyphs: dict[str, tuple] = {}
+        char: str
+        for char in charset:
+            self.glyphs[char] = self.__rasterize(char)
+        self.kerning: dict[tuple[str, str], float] = {}
+        first: str
+        second: str
+        for first in charset:
+            for second in charset:
+                adjustment: float = font.getlength(first + second) - \
+                    self.glyphs[first][5] - self.glyphs[second][5]
+                if adjustment:
+                    self.kerning[(first, second)] = adjustment
+
+    def covers(self, text: str) -> bool:
+        """
+            Check if every character of text is in the atlas
+        """
+        char: str
+        for char in text:
+            if char not in self.glyphs:
+                return False
+        return True
+
+    def measure(self, text: str) -> tuple[int, int]:
+        """
+            Get the text tile size, computed like the FreeType path of Display.displayText
+        """
+        layout_left: int = 0
+        layout_top: int | None = None
+        ink_right: int = 0
+        ink_bottom: int = 0
+        pen: int
+        char: str
+        for pen, char in zip(self.__pens(text), text):
+            mask, ink_x, ink_y, layout_x, layout_y, _ = self.glyphs[char]
+            layout_left = min(layout_left, pen + layout_x)
+            layout_top = layout_y if layout_top is None else min(layout_top, layout_y)
+            if mask is not None:
+                ink_right = max(ink_right, pen + ink_x + mask.shape[1])
+                ink_bottom = max(ink_bottom, ink_y + mask.shape[0])
+        return (ink_right - layout_left + (self.ascent - 7),
+                ink_bottom - (layout_top or 0) + self.descent)
+
+    def draw(self, text: str, background: np.ndarray, color: tuple) -> np.ndarray:
+        """
+            Blend text in color over an (height, width, 3) uint8 background, drawn from its top left corner
+        """
+        height, width = background.shape[:2]
+        coverage: np.ndarray = np.zeros((height, width), dtype=np.uint32)
+        pen: int
+        char: str
+        for pen, char in zip(self.__pens(text), text):
+            mask, ink_x, ink_y = self.glyphs[char][:3]
+            if mask is None:
+                continue
+            x0: int = pen + ink_x
+            y0: int = ink_y
+            mx0: int = max(0, -x0)
+            my0: int = max(0, -y0)
+            mx1: int = min(mask.shape[1], width - x0)
+            my1: int = min(mask.shape[0], height - y0)
+            if mx1 <= mx0 or my1 <= my0:
+                continue
+            # Overlapping glyphs keep their highest coverage, like the Pillow text mask
+            region: np.ndarray = coverage[y0 + my0:y0 + my1, x0 + mx0:x0 + mx1]
+            np.maximum(region, mask[my0:my1, mx0:mx1], out=region)
+        alpha: np.ndarray = coverage[..., np.newaxis]
+        ink: np.ndarray = np.array(color[:3], dtype=np.uint32)
+        # Same rounding as the Pillow ink blending
+        blend: np.ndarray = background.astype(np.uint32) * (255 - alpha) + ink * alpha + 128
+        return (((blend >> 8) + blend) >> 8).astype(np.uint8)
+
+    def __pens(self, text: str) -> list[int]:
+        """
+            Get the pen position of each character
+        """
+        pens: list[int] = []
+        pen: float = 0.0
+        previous: str | None = None
+        char: str
+        for char in text:
+            pen += self.kerning.get((previous, char), 0.0)
+            pens.append(round(pen))
+            pen += self.glyphs[char][5]
+            previous = char
+        return pens
+
+    def __rasterize(self, char: str) -> tuple:
+        """
+            Rasterize a glyph to (mask, ink_x, ink_y, layout_x, layout_y, advance)
+        """
+        layout_x, layout_y, layout_right, layout_bottom = self.font.getbbox(char)
+        pad: int = self.font.size
+        canvas: Image.Image = Image.new(
+            'L', (layout_right + 2 * pad, layout_bottom + pad), 0)
+        ImageDraw.Draw(canvas).text((pad, 0), char, font=self.font, fill=255)
+        bbox: tuple | None = canvas.getbbox()
+        mask: np.ndarray | None = None
+        ink_x: int = 0
+        ink_y: int = 0
+        if bbox is not None:
+            mask = np.asarray(canvas.crop(bbox), dtype=np.uint32)
+            ink_x = bbox[0] - pad
+            ink_y = bbox[1]
+        return (mask, ink_x, ink_y, layout_x, layout_y, self.font.getlength(char))
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 
+import importlib
+import json
 import os
+import platform
+import tempfile
+import threading
+from time import monotonic
+from typing import Callable
 
 import psutil
 from psutil._common import bytes2human
 
 from .Logger import logger
-from .Nvidia import Nvidia
-from .Radeon import Radeon
 
 
 class Hardware:
@@ -15,37 +20,181 @@ class Hardware:
         Get hardware informations
 
         Auto detect CPU and GPU brand
+
+        Each psutil source is sampled at most once per tick, lazily, in a snapshot
+        shared by every metric getter
+
+        CPU and GPU brands are detected on first use only, GPU backends are imported then.
+        Detection results are kept in a state file until the machine reboots.
+        GPU metrics are sampled by the Radeon and Nvidia metric providers
     """
 
     CPU_FREQ_ATTR = ['current', 'min', 'max']
     RAM_INFO_ATTR = ['total', 'available', 'used', 'free', 'percent']
     SWAP_INFO_ATTR = ['total', 'used', 'free', 'percent', 'sin', 'sout']
     DISK_INFO_ATTR = ['total', 'used', 'free', 'percent']
-    GPU_METHOD = ['gpuLoad', 'gpuPower', 'gpuTemp']
-
-    def __init__(self) -> None:
-        self.cpu_brand: str = self.__getCpuBrand()
-        self.gpu_brand: str = self.__getGpuBrand()
-        if self.gpu_brand == 'nvidia':
-            self.gpu: Nvidia = Nvidia()
-        elif self.gpu_brand == 'amd':
-            self.gpu: Radeon = Radeon()
-        else:
-            self.gpu: None = None
+
+    def __init__(self, state_path: str | None = None) -> None:
+        self.snapshot: dict[tuple, object] = {}
+        self.snapshot_lock: threading.Lock = threading.Lock()
+        self.tick_samples: int = 0
+        self.last_tick_samples: int = 0
+        self.total_samples: dict[str, int] = {}
+        self.state_path: str | None = state_path
+        self.state: dict | None = None
+        self.detection_lock: threading.RLock = threading.RLock()
+        self.timings: dict[str, float] = {}
+        self.backends: dict[str, type | None] = {}
+        self.__cpu_brand: str | None = None
+        self.__gpu_brand: str | None = None
+
+    @property
+    def cpu_brand(self) -> str:
+        with self.detection_lock:
+            if self.__cpu_brand is None:
+                self.__cpu_brand = self.__detect('cpu_brand', self.__getCpuBrand)
+            return self.__cpu_brand
+
+    @property
+    def gpu_brand(self) -> str:
+        with self.detection_lock:
+            if self.__gpu_brand is None:
+                self.__gpu_brand = self.__detect('gpu_brand', self.__getGpuBrand)
+            return self.__gpu_brand
+
+    def detect(self) -> tuple[str, str]:
+        """
+            Detect the cpu and gpu brands now instead of on first use, get (cpu_brand, gpu_brand)
+        """
+        return self.cpu_brand, self.gpu_brand
 
     @staticmethod
     def getCurrentProgramMemoryUsage() -> str:
         process = psutil.Process(os.getpid())
         return bytes2human(process.memory_info().rss)
 
+    def beginTick(self) -> None:
+        """
+            Start a new snapshot, sources are sampled again on first use
+        """
+        with self.snapshot_lock:
+            self.snapshot = {}
+            self.last_tick_samples = self.tick_samples
+            self.tick_samples = 0
+
+    def stats(self) -> dict:
+        """
+            Get psutil source sampling counters
+        """
+        return {
+            'last_tick_samples': self.last_tick_samples,
+            'total_samples': dict(self.total_samples)
+        }
+
+    def startupStats(self) -> dict:
+        """
+            Get backend import and detection times in seconds, detections served from the state file take no time
+        """
+        return dict(self.timings)
+
+    def __backend(self, name: str) -> type | None:
+        """
+            Import a GPU backend on first use, None if its library is missing
+        """
+        if name not in self.backends:
+            start: float = monotonic()
+            try:
+                module = importlib.import_module('.' + name, __package__)
+                self.backends[name] = getattr(module, name)
+            except ImportError as e:
+                logger.warning(name + ' backend unavailable ' + str(e))
+                self.backends[name] = None
+            self.timings['import_' + name.lower()] = monotonic() - start
+        return self.backends[name]
+
+    def __detect(self, key: str, detect: Callable[[], str]) -> str:
+        """
+            Get a detection result from the state file, running the detection on a miss
+        """
+        state: dict = self.__loadState()
+        if key in state['results']:
+            logger.info(key + ' ' + state['results'][key] + ' loaded from state')
+            return state['results'][key]
+        start: float = monotonic()
+        result: str = detect()
+        self.timings['detect_' + key] = monotonic() - start
+        state['results'][key] = result
+        self.__saveState(state)
+        return result
+
+    def __stateValidity(self) -> dict:
+        """
+            Machine identity the detection results hold for, the hardware only changes across a reboot
+        """
+        return {
+            'node': platform.node(),
+            'release': platform.release(),
+            'boot_time': psutil.boot_time()
+        }
+
+    def __loadState(self) -> dict:
+        if self.state is not None:
+            return self.state
+        validity: dict = self.__stateValidity()
+        self.state = {'validity': validity, 'results': {}}
+        if self.state_path is None:
+            return self.state
+        try:
+            with open(self.state_path, 'r') as f:
+                state: dict = json.load(f)
+        except (OSError, ValueError):
+            return self.state
+        if state.get('validity') == validity and isinstance(state.get('results'), dict):
+            self.state = state
+        else:
+            logger.info('Hardware state outdated, detecting again')
+        return self.state
+
+    def __saveState(self, state: dict) -> None:
+        if self.state_path is None:
+            return
+        try:
+            directory: str = os.path.dirname(self.state_path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(
+                dir=directory, prefix=os.path.basename(self.state_path) + '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(state, f)
+                os.replace(temporary, self.state_path)
+            except BaseException:
+                os.remove(temporary)
+                raise
+        except OSError as e:
+            logger.warning('Hardware state not saved ' + str(e))
+
+    def sample(self, source: str, *args):
+        """
+            Get the psutil source result of the current snapshot, sampling it on first use
+        """
+        key: tuple = (source,) + args
+        with self.snapshot_lock:
+            if key not in self.snapshot:
+                self.snapshot[key] = getattr(psutil, source)(*args)
+                self.tick_samples += 1
+                self.total_samples[source] = self.total_samples.get(
+                    source, 0) + 1
+            return self.snapshot[key]
+
     def __getCpuBrand(self) -> str:
         """
             Get CPU brand based on sensor temparature
         """
-        if 'coretemp' in psutil.sensors_temperatures():
+        sensors: dict = self.sample('sensors_temperatures')
+        if 'coretemp' in sensors:
             logger.info('intel cpu detected')
             return 'coretemp'
-        elif 'k10temp' in psutil.sensors_temperatures():
+        elif 'k10temp' in sensors:
             logger.info('amd cpu detected')
             return 'k10temp'
         else:
@@ -56,16 +205,29 @@ class Hardware:
         """
             Get GPU brand name
         """
-        if Nvidia.isAvailable():
+        if self.__isAvailable('Nvidia'):
             logger.info('nvidia gpu detected')
             return 'nvidia'
-        elif Radeon.isAvailable():
+        elif self.__isAvailable('Radeon'):
             logger.info('amd gpu detected')
             return 'amd'
         else:
             logger.info('unknow gpu detected')
             return 'unknow'
 
+    def __isAvailable(self, name: str) -> bool:
+        """
+            Check a GPU backend, a missing library or device node means no GPU of that brand
+        """
+        backend: type | None = self.__backend(name)
+        if backend is None:
+            return False
+        try:
+            return backend.isAvailable()
+        except OSError as e:
+            logger.info(name + ' gpu not found ' + str(e))
+            return False
+
     def __formatString(self, value: float | int, rounded: bool = False, endString: str = '') -> str:
         """
             Format float or int to string
@@ -81,7 +243,7 @@ class Hardware:
         if attribute not in self.RAM_INFO_ATTR:
             raise ValueError('Attribute can only be one of ' +
                              str(self.RAM_INFO_ATTR))
-        return getattr(psutil.virtual_memory(), attribute)
+        return getattr(self.sample('virtual_memory'), attribute)
 
     def __cpuGetFreqs(self, attribute: str) -> int:
         """
@@ -90,7 +252,7 @@ class Hardware:
         if attribute not in self.CPU_FREQ_ATTR:
             raise ValueError('Attribute can only be one of ' +
                              str(self.CPU_FREQ_ATTR))
-        return getattr(psutil.cpu_freq(), attribute)
+        return getattr(self.sample('cpu_freq'), attribute)
 
     def __swapGetInfos(self, attribute: str) -> int:
         """
@@ -99,43 +261,26 @@ class Hardware:
         if attribute not in self.SWAP_INFO_ATTR:
             raise ValueError('Attribute can only be one of ' +
                              str(self.SWAP_INFO_ATTR))
-        return getattr(psutil.swap_memory(), attribute)
-
-    def __gpuGetInfos(self, attribute: str) -> int:
-        """
-            Wrapper for GPUs class
-        """
-        if attribute not in self.GPU_METHOD:
-            raise ValueError('Attribute can only be one of ' +
-                             str(self.GPU_METHOD))
-        match self.gpu_brand:
-            case 'nvidia':
-                return 'nvidia gpus are not currently supported'
-            case 'amd':
-                return getattr(Radeon, attribute)(self.gpu)
-            case 'intel':
-                return 'intel gpus are not currently supported'
-            case default:
-                return 'unknow gpus are not currently supported'
+        return getattr(self.sample('swap_memory'), attribute)
 
     def __diskGetUsage(self, path: str, attribute: str) -> int:
         if attribute not in self.DISK_INFO_ATTR:
             raise ValueError('Attribute can only be one of ' +
                              str(self.DISK_INFO_ATTR))
-        return getattr(psutil.disk_usage(path), attribute)
+        return getattr(self.sample('disk_usage', path), attribute)
 
     def cpuGetCount(self, logical: bool = True) -> str:
         """
             Get CPU core count
         """
-        return self.__formatString(psutil.cpu_count(logical))
+        return self.__formatString(self.sample('cpu_count', logical))
 
     def cpuGetCurrentTemp(self, junction: bool = False) -> str:
         """
             Get CPU die temperature
         """
         is_junction_allowed: bool = False
-        temps: list = psutil.sensors_temperatures()[self.cpu_brand]
+        temps: list = self.sample('sensors_temperatures')[self.cpu_brand]
         if len(temps) > 1:
             is_junction_allowed = True
         return self.__formatString(temps[1 if not junction and is_junction_allowed else 0].current, True, '°C')
@@ -144,13 +289,14 @@ class Hardware:
         """
             Get CPU current load
         """
-        return self.__formatString(psutil.cpu_percent(), endString='%')
+        return self.__formatString(self.sample('cpu_percent'), endString='%')
 
     def cpuGetAverageLoad(self) -> str:
         """
             Get CPU load average
         """
-        return self.__formatString([round(x / psutil.cpu_count() * 100, 1) for x in psutil.getloadavg()])
+        cpu_count: int = self.sample('cpu_count', True)
+        return self.__formatString([round(x / cpu_count * 100, 1) for x in self.sample('getloadavg')])
 
     def cpuGetCurrentFreq(self, Ghz: bool = True) -> str:
         """
@@ -242,24 +388,6 @@ class Hardware:
         """
         return bytes2human(self.__swapGetInfos('sout'))
 
-    def gpuGetLoad(self) -> str:
-        """
-            Get the GPU load percent
-        """
-        return self.__formatString(self.__gpuGetInfos('gpuLoad'), True, '%')
-
-    def gpuGetPower(self) -> str:
-        """
-            Get the GPU power in watt
-        """
-        return self.__formatString(self.__gpuGetInfos('gpuPower'), True, 'Watts')
-
-    def gpuGetTemp(self) -> str:
-        """
-            Get the GPU power in watt
-        """
-        return self.__formatString(self.__gpuGetInfos('gpuTemp'), endString='°C')
-
     def diskGetTotal(self, path: str) -> str:
         """
             Get the disk total size
@@ -288,4 +416,4 @@ class Hardware:
         """
             Get the current user name
         """
-        return psutil.users()[0].name
+        return self.sample('users')[0].name
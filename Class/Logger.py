@@ -1,9 +1,12 @@
 import logging
+from multiprocessing import current_process
 
+# worker processes append to the log of the main process instead of truncating it
 logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
     handlers=[
-        logging.FileHandler('app.log', mode='w'),
+        logging.FileHandler(
+            'app.log', mode='w' if current_process().name == 'MainProcess' else 'a'),
         logging.StreamHandler()
     ],
     datefmt='%H:%M:%S')
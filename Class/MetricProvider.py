@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import threading
+from abc import ABC, abstractmethod
+
+from psutil._common import bytes2human
+
+from .Hardware import Hardware
+
+
+class MetricProvider(ABC):
+    """
+        Source of metrics sampled in one batch per tick
+
+        A provider lists the metric names it offers, opens its handles once and answers every
+        (metric, param) request of a tick in a single collect call.
+        Plugins subclass it and implement collect, they are built with the Hardware and the configuration
+    """
+
+    NAME: str = ''
+    METRICS: tuple[str, ...] = ()
+
+    def __init__(self, hardware: Hardware, config: dict) -> None:
+        self.hardware: Hardware = hardware
+        self.config: dict = config
+        self.lock: threading.Lock = threading.Lock()
+
+    def isAvailable(self) -> bool:
+        """
+            Check if the provider can run on this machine
+        """
+        return True
+
+    def offers(self, metric: str) -> bool:
+        """
+            Check if the provider samples the metric
+        """
+        return metric in self.METRICS
+
+    def open(self) -> None:
+        """
+            Open the persistent handles, called once before the first collect
+        """
+
+    def close(self) -> None:
+        """
+            Release the persistent handles
+        """
+
+    @abstractmethod
+    def collect(self, requests: list[tuple[str, str | None]]) -> dict[tuple[str, str | None], str | Exception]:
+        """
+            Sample the (metric, param) requests, get their formatted value or the exception raised sampling them
+        """
+
+    @staticmethod
+    def formatValue(value: float | int, rounded: bool = False, unit: str = '') -> str:
+        """
+            Format a value like the Hardware getters, the 'bytes' unit is made human readable
+        """
+        if unit == 'bytes':
+            return bytes2human(int(value))
+        if rounded:
+            return f'{round(value, 1)} {unit}'
+        return f'{value} {unit}'
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import importlib
+import threading
+from time import perf_counter
+from typing import Callable, Iterable, Iterator
+
+from .Hardware import Hardware
+from .Logger import logger
+from .MetricProvider import MetricProvider
+from .Telemetry import Telemetry
+
+
+class MetricRegistry:
+    """
+        Resolve metric names to the provider sampling them
+
+        Providers are tried in the configured order, then user plugins given as 'module:Class'.
+        A provider is imported, checked and opened on first use only, collect groups
+        the requests of a tick so each provider is called once
+    """
+
+    PROVIDERS: dict[str, str] = {
+        'synthetic': 'SyntheticProvider',
+        'proc': 'ProcProvider',
+        'psutil': 'PsutilProvider',
+        'radeon': 'RadeonProvider',
+        'nvidia': 'NvidiaProvider'
+    }
+    DEFAULT_ORDER: list[str] = ['synthetic', 'proc', 'psutil', 'radeon', 'nvidia']
+
+    def __init__(self, hardware: Hardware, config: dict, telemetry: Telemetry | None = None) -> None:
+        self.hardware: Hardware = hardware
+        self.config: dict = config
+        self.telemetry: Telemetry | None = telemetry
+        providers_conf: dict = config.get('metric_providers', {})
+        self.order: list[str] = list(providers_conf.get('order', self.DEFAULT_ORDER))
+        self.order += [plugin for plugin in providers_conf.get('plugins', [])
+                       if plugin not in self.order]
+        self.providers: dict[str, MetricProvider | None] = {}
+        self.resolved: dict[str, MetricProvider | None] = {}
+        self.collects: dict[str, int] = {}
+        self.lock: threading.RLock = threading.RLock()
+
+    @staticmethod
+    def fromConfig(config: dict, telemetry: Telemetry | None = None) -> 'MetricRegistry':
+        """
+            Build the registry of the 'metric_providers' configuration with its own Hardware
+        """
+        return MetricRegistry(Hardware(config.get('hardware', {}).get('state_file')), config, telemetry)
+
+    def provider(self, metric: str) -> MetricProvider | None:
+        """
+            Get the first provider offering the metric, None if there is none
+        """
+        with self.lock:
+            if metric not in self.resolved:
+                self.resolved[metric] = next((provider for provider in self.__providers()
+                                              if provider.offers(metric)), None)
+                if self.resolved[metric] is None:
+                    logger.warning('No provider for metric ' + metric)
+                else:
+                    logger.info('Metric ' + metric + ' provided by ' + self.resolved[metric].NAME)
+            return self.resolved[metric]
+
+    def sample(self, metric: str, param: str | None = None) -> str:
+        """
+            Sample a single metric, raising the error of its provider
+        """
+        result: str | Exception = self.collect([(metric, param)])[(metric, param)]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def collect(self, requests: Iterable[tuple[str, str | None]]) -> dict[tuple[str, str | None], str | Exception]:
+        """
+            Sample the (metric, param) requests with one collect per provider,
+            get their formatted value or the exception raised sampling them
+        """
+        results: dict[tuple[str, str | None], str | Exception] = {}
+        batches: dict[MetricProvider, list[tuple[str, str | None]]] = {}
+        request: tuple[str, str | None]
+        for request in requests:
+            provider: MetricProvider | None = self.provider(request[0])
+            if provider is None:
+                results[request] = LookupError('No provider for metric ' + request[0])
+            else:
+                batches.setdefault(provider, []).append(request)
+        batch: list[tuple[str, str | None]]
+        for provider, batch in batches.items():
+            start: float = perf_counter()
+            with provider.lock:
+                try:
+                    results.update(provider.collect(batch))
+                except Exception as e:
+                    results.update(dict.fromkeys(batch, e))
+            if self.telemetry:
+                self.telemetry.observe('provider_collect_seconds',
+                                       perf_counter() - start, 'provider', provider.NAME)
+            self.collects[provider.NAME] = self.collects.get(provider.NAME, 0) + 1
+        return results
+
+    def close(self) -> None:
+        """
+            Release the handles of every opened provider
+        """
+        with self.lock:
+            provider: MetricProvider | None
+            for provider in self.providers.values():
+                if provider:
+                    provider.close()
+            self.providers.clear()
+            self.resolved.clear()
+
+    def stats(self) -> dict:
+        """
+            Get the opened providers and their collect counters
+        """
+        return {
+            'providers_open': sum(1 for provider in self.providers.values() if provider),
+            'metrics_resolved': sum(1 for provider in self.resolved.values() if provider),
+            'collects': dict(self.collects)
+        }
+
+    def __providers(self) -> Iterator[MetricProvider]:
+        name: str
+        for name in self.order:
+            provider: MetricProvider | None = self.__load(name)
+            if provider:
+                yield provider
+
+    def __load(self, name: str) -> MetricProvider | None:
+        """
+            Import, check and open a provider on first use, None if it can not run here
+
+            Any error of a plugin while loading only disables it, it must not stop the sampling
+        """
+        if name not in self.providers:
+            provider: MetricProvider | None = None
+            try:
+                if name in self.PROVIDERS:
+                    module = importlib.import_module('.' + self.PROVIDERS[name], __package__)
+                    provider_class: type = getattr(module, self.PROVIDERS[name])
+                else:
+                    module_name, _, class_name = name.partition(':')
+                    provider_class: type = getattr(importlib.import_module(module_name), class_name)
+                provider = provider_class(self.hardware, self.config)
+                if provider.isAvailable():
+                    provider.open()
+                    logger.info('Metric provider ' + name + ' opened')
+                else:
+                    provider = None
+            except Exception as e:
+                logger.warning('Metric provider ' + name + ' unavailable ' + repr(e))
+                provider = None
+            self.providers[name] = provider
+        return self.providers[name]
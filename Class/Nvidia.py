@@ -1,9 +1,31 @@
 #!/usr/bin/env python3
 
+import math
+import subprocess
+import threading
+
 import GPUtil
 
 
 class Nvidia:
+    """
+        NVIDIA GPU handle
+
+        A single nvidia-smi process is kept running in loop mode, its latest line is parsed on query
+    """
+
+    FIELDS: tuple[str, ...] = ('utilization.gpu', 'power.draw', 'temperature.gpu')
+
+    def __init__(self, gpu_id: int = 0, interval_ms: int = 1000) -> None:
+        self.process: subprocess.Popen = subprocess.Popen(
+            ['nvidia-smi', '--query-gpu=' + ','.join(self.FIELDS), '--format=csv,noheader,nounits',
+             '--id=' + str(gpu_id), '--loop-ms=' + str(interval_ms)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        self.line: str = ''
+        self.ready: threading.Event = threading.Event()
+        self.thread: threading.Thread = threading.Thread(
+            name='nvidia-smi', target=self.__read, daemon=True)
+        self.thread.start()
 
     @staticmethod
     def isAvailable() -> bool:
@@ -11,3 +33,32 @@ class Nvidia:
             Check if GPU is available
         """
         return len(GPUtil.getGPUs()) > 0
+
+    def query(self, timeout: float = 2.0) -> dict[str, float]:
+        """
+            Get the latest {field: value} reading, NaN for the fields the GPU does not report
+        """
+        if not self.ready.wait(timeout):
+            raise TimeoutError('nvidia-smi sent no reading')
+        values: dict[str, float] = {}
+        field: str
+        text: str
+        for field, text in zip(self.FIELDS, self.line.split(',')):
+            try:
+                values[field] = float(text)
+            except ValueError:
+                values[field] = math.nan
+        return values
+
+    def close(self) -> None:
+        """
+            Stop the nvidia-smi process
+        """
+        self.process.terminate()
+        self.process.wait()
+
+    def __read(self) -> None:
+        line: str
+        for line in self.process.stdout:
+            self.line = line.strip()
+            self.ready.set()
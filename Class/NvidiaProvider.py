@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import math
+
+from .Hardware import Hardware
+from .MetricProvider import MetricProvider
+from .Nvidia import Nvidia
+
+
+class NvidiaProvider(MetricProvider):
+    """
+        NVIDIA GPU metrics, one reading of the persistent nvidia-smi process per batch
+    """
+
+    NAME: str = 'nvidia'
+    METRICS: tuple[str, ...] = ('gpuGetLoad', 'gpuGetPower', 'gpuGetTemp')
+    FIELDS: dict[str, tuple[str, bool, str]] = {
+        'gpuGetLoad': ('utilization.gpu', True, '%'),
+        'gpuGetPower': ('power.draw', True, 'Watts'),
+        'gpuGetTemp': ('temperature.gpu', False, '°C')
+    }
+
+    def __init__(self, hardware: Hardware, config: dict) -> None:
+        super().__init__(hardware, config)
+        self.gpu: Nvidia | None = None
+
+    def isAvailable(self) -> bool:
+        return self.hardware.gpu_brand == 'nvidia'
+
+    def open(self) -> None:
+        self.gpu = Nvidia(self.config.get('metric_providers', {}).get('nvidia', {}).get('gpu_id', 0),
+                          self.config.get('collector', {}).get('interval_ms', 1000))
+
+    def close(self) -> None:
+        if self.gpu:
+            self.gpu.close()
+
+    def collect(self, requests: list[tuple[str, str | None]]) -> dict[tuple[str, str | None], str | Exception]:
+        try:
+            values: dict[str, float] = self.gpu.query()
+        except TimeoutError as e:
+            return {request: e for request in requests}
+        results: dict[tuple[str, str | None], str | Exception] = {}
+        metric: str
+        param: str | None
+        for metric, param in requests:
+            field, rounded, unit = self.FIELDS[metric]
+            if math.isnan(values.get(field, math.nan)):
+                results[(metric, param)] = ValueError(field + ' is not reported by this GPU')
+            else:
+                results[(metric, param)] = self.formatValue(values[field], rounded, unit)
+        return results
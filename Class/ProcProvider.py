@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import os
+
+from .Hardware import Hardware
+from .MetricProvider import MetricProvider
+
+
+class ProcProvider(MetricProvider):
+    """
+        CPU load and memory read straight from /proc on Linux
+
+        /proc/stat and /proc/meminfo are opened once and read with a single pread per batch,
+        values are computed and formatted like the psutil ones
+    """
+
+    NAME: str = 'proc'
+    METRICS: tuple[str, ...] = (
+        'cpuGetCurrentLoad', 'cpuGetAverageLoad',
+        'ramGetPercent', 'ramGetTotal', 'ramGetAvailable', 'ramGetUsed', 'ramGetFree'
+    )
+    READ_SIZE: int = 8192
+
+    def __init__(self, hardware: Hardware, config: dict) -> None:
+        super().__init__(hardware, config)
+        self.fds: dict[str, int] = {}
+        self.cpu_times: tuple[int, int] | None = None
+
+    def isAvailable(self) -> bool:
+        return all(os.path.exists('/proc/' + name) for name in ('stat', 'meminfo'))
+
+    def open(self) -> None:
+        name: str
+        for name in ('stat', 'meminfo'):
+            self.fds[name] = os.open('/proc/' + name, os.O_RDONLY)
+
+    def close(self) -> None:
+        fd: int
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
+
+    def collect(self, requests: list[tuple[str, str | None]]) -> dict[tuple[str, str | None], str | Exception]:
+        memory: dict[str, int] | None = None
+        results: dict[tuple[str, str | None], str | Exception] = {}
+        metric: str
+        param: str | None
+        for metric, param in requests:
+            try:
+                match metric:
+                    case 'cpuGetCurrentLoad':
+                        value: str = self.formatValue(self.__cpuPercent(self.__read('stat')), unit='%')
+                    case 'cpuGetAverageLoad':
+                        cpu_count: int = os.cpu_count() or 1
+                        value: str = self.formatValue([round(load / cpu_count * 100, 1)
+                                                       for load in os.getloadavg()])
+                    case _:
+                        if memory is None:
+                            memory = self.__memory(self.__read('meminfo'))
+                        if metric == 'ramGetPercent':
+                            value: str = self.formatValue(round((memory['total'] - memory['available']) /
+                                                                memory['total'] * 100, 1), unit='%')
+                        else:
+                            value: str = self.formatValue(memory[metric[6:].lower()], unit='bytes')
+            except (OSError, ValueError, KeyError) as e:
+                results[(metric, param)] = e
+                continue
+            results[(metric, param)] = value
+        return results
+
+    def __read(self, name: str) -> str:
+        return os.pread(self.fds[name], self.READ_SIZE, 0).decode()
+
+    def __cpuPercent(self, content: str) -> float:
+        """
+            Busy percent of every CPU since the previous batch, guest time is already counted in user time
+        """
+        fields: list[int] = [int(field) for field in content.split('\n', 1)[0].split()[1:]]
+        total: int = sum(fields[:8])
+        busy: int = total - fields[3] - fields[4]
+        previous: tuple[int, int] | None = self.cpu_times
+        self.cpu_times = (total, busy)
+        if previous is None or total <= previous[0]:
+            return round(busy / total * 100, 1) if total else 0.0
+        return round((busy - previous[1]) / (total - previous[0]) * 100, 1)
+
+    def __memory(self, content: str) -> dict[str, int]:
+        """
+            Memory figures in bytes, used is computed like psutil
+        """
+        values: dict[str, int] = {}
+        line: str
+        for line in content.splitlines():
+            key, _, value = line.partition(':')
+            values[key] = int(value.split()[0]) * 1024
+        total: int = values['MemTotal']
+        free: int = values['MemFree']
+        used: int = total - free - values.get('Buffers', 0) - \
+            values.get('Cached', 0) - values.get('SReclaimable', 0)
+        return {
+            'total': total,
+            'available': values['MemAvailable'],
+            'used': used if used >= 0 else total - free,
+            'free': free
+        }
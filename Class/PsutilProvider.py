@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+from typing import Callable
+
+from .MetricProvider import MetricProvider
+
+
+class PsutilProvider(MetricProvider):
+    """
+        Metrics of the Hardware getters, every psutil source is sampled once per batch
+    """
+
+    NAME: str = 'psutil'
+    METRICS: tuple[str, ...] = (
+        'cpuGetCount', 'cpuGetCurrentTemp', 'cpuGetCurrentLoad', 'cpuGetAverageLoad',
+        'cpuGetCurrentFreq', 'cpuGetMaxFreq', 'cpuGetMinFreq',
+        'ramGetPercent', 'ramGetTotal', 'ramGetAvailable', 'ramGetUsed', 'ramGetFree',
+        'swapGetTotal', 'swapGetUsed', 'swapGetFree', 'swapGetPercent', 'swapGetSin', 'swapGetSout',
+        'diskGetTotal', 'diskGetUsed', 'diskGetFree', 'diskGetPercent',
+        'userGetName'
+    )
+
+    def collect(self, requests: list[tuple[str, str | None]]) -> dict[tuple[str, str | None], str | Exception]:
+        self.hardware.beginTick()
+        results: dict[tuple[str, str | None], str | Exception] = {}
+        metric: str
+        param: str | None
+        for metric, param in requests:
+            getter: Callable[..., str] = getattr(self.hardware, metric)
+            try:
+                results[(metric, param)] = getter(param) if param else getter()
+            except Exception as e:
+                results[(metric, param)] = e
+        return results
@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
 
-import math
-
 import pyamdgpuinfo
 
-from .Logger import logger
-
 
 class Radeon:
+    """
+        AMD GPU handle, queries raise when the device does not support them
+    """
 
     def __init__(self, gpu_id: int = 1) -> None:
         self.gpu = pyamdgpuinfo.get_gpu(pyamdgpuinfo.detect_gpus() - gpu_id)
@@ -23,28 +22,16 @@ class Radeon:
         """
             Get GPU load in percent
         """
-        try:
-            return (self.gpu.query_load()) * 100
-        except:
-            logger.warn("gpuLoad isn't available on this device")
-            return math.nan
+        return (self.gpu.query_load()) * 100
 
-    def gpuPower(self):
+    def gpuPower(self) -> float:
         """
             Get GPU power in watt
         """
-        try:
-            return self.gpu.query_power()
-        except:
-            logger.warn("gpuPower isn't available on this device")
-            return math.nan
+        return self.gpu.query_power()
 
     def gpuTemp(self) -> float:
         """
             Get GPU temperature in °C
         """
-        try:
-            return self.gpu.query_temperature()
-        except:
-            logger.warn("gpuTemp isn't available on this device")
-            return math.nan
+        return self.gpu.query_temperature()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+from .Hardware import Hardware
+from .Logger import logger
+from .MetricProvider import MetricProvider
+from .Radeon import Radeon
+
+
+class RadeonProvider(MetricProvider):
+    """
+        AMD GPU metrics from one pyamdgpuinfo handle kept open
+
+        A query the device does not support is reported once, then skipped
+    """
+
+    NAME: str = 'radeon'
+    METRICS: tuple[str, ...] = ('gpuGetLoad', 'gpuGetPower', 'gpuGetTemp')
+    QUERIES: dict[str, tuple[str, bool, str]] = {
+        'gpuGetLoad': ('gpuLoad', True, '%'),
+        'gpuGetPower': ('gpuPower', True, 'Watts'),
+        'gpuGetTemp': ('gpuTemp', False, '°C')
+    }
+
+    def __init__(self, hardware: Hardware, config: dict) -> None:
+        super().__init__(hardware, config)
+        self.gpu: Radeon | None = None
+        self.unsupported: dict[str, Exception] = {}
+
+    def isAvailable(self) -> bool:
+        return self.hardware.gpu_brand == 'amd'
+
+    def open(self) -> None:
+        self.gpu = Radeon(self.config.get('metric_providers', {}).get(
+            'radeon', {}).get('gpu_id', 1))
+
+    def collect(self, requests: list[tuple[str, str | None]]) -> dict[tuple[str, str | None], str | Exception]:
+        results: dict[tuple[str, str | None], str | Exception] = {}
+        metric: str
+        param: str | None
+        for metric, param in requests:
+            if metric in self.unsupported:
+                results[(metric, param)] = self.unsupported[metric]
+                continue
+            query, rounded, unit = self.QUERIES[metric]
+            try:
+                results[(metric, param)] = self.formatValue(
+                    getattr(self.gpu, query)(), rounded, unit)
+            except Exception as e:
+                logger.warning(metric + " isn't available on this device " + str(e))
+                self.unsupported[metric] = e
+                results[(metric, param)] = e
+        return results
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .AssetCache import AssetCache
+from .BackgroundLayer import BackgroundLayer
+from .FontPool import FontPool
+from .Logger import logger
+from .Rgb565 import Rgb565
+from .Telemetry import Telemetry
+
+
+class RenderPool:
+    """
+        Text rasterization in worker processes
+
+        A job is a small tuple, the worker draws the RGB565 tile straight into a slot of a shared
+        memory arena and only sends back its shape. The tile is read as a view of the slot, handed
+        as is to the display and the serial writer, the slot is reused once the last view is gone.
+        A crashed or hung worker is replaced by restarting the pool and the job is submitted again once
+    """
+
+    def __init__(self, assets_dir: str = 'assets/', asset_cache_path: str | None = None, workers: int = 2,
+                 slots: int = 32, slot_size: int = 65536, timeout_ms: int = 1000, telemetry: Telemetry | None = None) -> None:
+        assert workers > 0, 'Render pool needs at least one worker'
+        self.assets_dir: str = assets_dir
+        self.asset_cache_path: str | None = asset_cache_path
+        self.workers: int = workers
+        self.slot_size: int = slot_size
+        self.timeout: float = timeout_ms / 1000
+        self.telemetry: Telemetry | None = telemetry
+        self.memory: SharedMemory = SharedMemory(
+            create=True, size=slots * slot_size)
+        self.free: list[int] = list(range(slots))
+        self.slots: int = slots
+        self.lock: threading.Lock = threading.Lock()
+        self.context: multiprocessing.context.BaseContext = multiprocessing.get_context(
+            'spawn')
+        self.executor: ProcessPoolExecutor = self.__executor()
+        self.generation: int = 0
+        self.jobs: int = 0
+        self.inline_results: int = 0
+        self.restarts: int = 0
+        self.failures: int = 0
+        if telemetry:
+            telemetry.addSource('render_pool', self.stats)
+
+    @staticmethod
+    def fromConfig(config: dict, telemetry: Telemetry | None = None) -> 'RenderPool | None':
+        """
+            Build the pool of the 'render_pool' configuration, None when disabled
+        """
+        pool_conf: dict = config.get('render_pool', {})
+        if not pool_conf.get('enabled', False):
+            return None
+        asset_cache_conf: dict = config.get('asset_cache', {})
+        return RenderPool(
+            config.get('assets_dir', 'assets/'),
+            asset_cache_conf.get('path', '.cache/assets/') if asset_cache_conf.get(
+                'enabled', True) else None,
+            pool_conf.get('workers', 2),
+            pool_conf.get('slots', 32),
+            pool_conf.get('slot_size', 65536),
+            pool_conf.get('timeout_ms', 1000),
+            telemetry)
+
+    def renderText(self, text: str, box: tuple, font_path: str, font_size: int, font_color: tuple, background_color: tuple, background_image: str | None) -> np.ndarray | None:
+        """
+            Render text to an RGB565 tile in a worker, like the FreeType path of Display.displayText
+
+            The tile must not be modified, None if the pool failed even after a restart
+        """
+        slot: int | None = self.__acquire()
+        job: tuple = (text, box, font_path, font_size, tuple(font_color),
+                      tuple(background_color), background_image,
+                      None if slot is None else slot * self.slot_size, self.slot_size)
+        result: tuple | None = None
+        attempt: int
+        for attempt in range(2):
+            with self.lock:
+                executor: ProcessPoolExecutor = self.executor
+                generation: int = self.generation
+            try:
+                result = executor.submit(RenderWorker.render, job).result(self.timeout)
+                break
+            except BrokenProcessPool:
+                self.__restart(generation, 'Render worker crashed')
+            except TimeoutError:
+                self.__restart(generation, 'Render worker timed out')
+        if result is None:
+            self.__release(slot)
+            with self.lock:
+                self.failures += 1
+            return None
+        shape, pixels, render_seconds, convert_seconds = result
+        with self.lock:
+            self.jobs += 1
+            if pixels is not None:
+                self.inline_results += 1
+        if self.telemetry:
+            self.telemetry.observe(
+                'text_render_seconds', render_seconds, 'renderer', 'pool')
+            self.telemetry.observe('rgb565_convert_seconds', convert_seconds)
+        if pixels is not None:
+            self.__release(slot)
+            return pixels
+        tile: np.ndarray = np.ndarray(shape, dtype=Rgb565.DTYPE,
+                                      buffer=self.memory.buf, offset=slot * self.slot_size)
+        tile.flags.writeable = False
+        weakref.finalize(tile, self.__release, slot)
+        return tile
+
+    def close(self) -> None:
+        """
+            Stop the workers and free the shared memory
+        """
+        with self.lock:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            self.memory.close()
+        except BufferError:
+            pass  # tiles still in use, the mapping goes away with them
+        self.memory.unlink()
+
+    def stats(self) -> dict:
+        """
+            Get job, slot and restart counters
+        """
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'jobs': self.jobs,
+                'inline_results': self.inline_results,
+                'free_slots': len(self.free),
+                'slots': self.slots,
+                'restarts': self.restarts,
+                'failures': self.failures
+            }
+
+    def __executor(self) -> ProcessPoolExecutor:
+        """
+            Start the workers, waiting for them so their startup does not count in the job timeout
+        """
+        executor: ProcessPoolExecutor = ProcessPoolExecutor(
+            self.workers, self.context, RenderWorker.start,
+            (self.memory.name, self.assets_dir, self.asset_cache_path))
+        futures: list = [executor.submit(RenderWorker.ready)
+                         for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        return executor
+
+    def __restart(self, generation: int, reason: str) -> None:
+        """
+            Replace the broken executor, once for every job that saw it break
+
+            Its workers are killed first, so a hung one can not write to a slot given back afterwards
+        """
+        with self.lock:
+            if generation != self.generation:
+                return
+            logger.warning(reason + ', restarting the pool')
+            process: multiprocessing.Process
+            for process in list((self.executor._processes or {}).values()):
+                process.kill()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self.__executor()
+            self.generation += 1
+            self.restarts += 1
+
+    def __acquire(self) -> int | None:
+        """
+            Take a free slot, None when every slot is used and the tile comes back pickled
+        """
+        with self.lock:
+            return self.free.pop() if self.free else None
+
+    def __release(self, slot: int | None) -> None:
+        if slot is None:
+            return
+        with self.lock:
+            self.free.append(slot)
+
+
+class RenderWorker:
+    """
+        Rendering state of a pool worker process, fonts and backgrounds are loaded once per worker
+    """
+
+    current: 'RenderWorker | None' = None
+
+    def __init__(self, memory_name: str, assets_dir: str, asset_cache_path: str | None) -> None:
+        self.memory: SharedMemory = SharedMemory(name=memory_name)
+        self.fonts: FontPool = FontPool(assets_dir + 'fonts/')
+        self.asset_cache: AssetCache | None = AssetCache(
+            asset_cache_path) if asset_cache_path else None
+        self.backgrounds: dict[str, BackgroundLayer] = {}
+
+    @staticmethod
+    def start(memory_name: str, assets_dir: str, asset_cache_path: str | None) -> None:
+        """
+            Set up the worker process, run by the pool when it starts a worker
+        """
+        RenderWorker.current = RenderWorker(
+            memory_name, assets_dir, asset_cache_path)
+
+    @staticmethod
+    def ready() -> bool:
+        """
+            Do nothing, used to wait for the workers to start
+        """
+        return True
+
+    @staticmethod
+    def render(job: tuple) -> tuple:
+        """
+            Render a RenderPool job, get (shape, pixels, render_seconds, convert_seconds),
+            pixels being None when the tile was written to the job slot
+        """
+        return RenderWorker.current.renderText(*job)
+
+    def renderText(self, text: str, box: tuple, font_path: str, font_size: int, font_color: tuple, background_color: tuple, background_image: str | None, offset: int | None, size: int) -> tuple:
+        x, y = box[:2]
+        if background_image is None:
+            text_image: Image.Image = Image.new(
+                'RGB', (box[2] - x, box[3] - y), background_color)
+        else:
+            text_image: Image.Image = self.__getBackground(
+                background_image).image(box)
+
+        start: float = perf_counter()
+        draw: ImageDraw.ImageDraw = ImageDraw.Draw(text_image)
+        draw.text((0, 0), text, font=self.fonts.get(font_path, font_size), fill=font_color)
+        rendered: float = perf_counter()
+        shape: tuple[int, int] = (text_image.size[1], text_image.size[0])
+        if offset is None or 2 * shape[0] * shape[1] > size:
+            tile: np.ndarray = Rgb565.fromImage(text_image)
+            return shape, tile, rendered - start, perf_counter() - rendered
+        tile: np.ndarray = np.ndarray(shape, dtype=Rgb565.DTYPE,
+                                      buffer=self.memory.buf, offset=offset)
+        tile[...] = Rgb565.fromImage(text_image)
+        return shape, None, rendered - start, perf_counter() - rendered
+
+    def __getBackground(self, path: str) -> BackgroundLayer:
+        layer: BackgroundLayer | None = self.backgrounds.get(path)
+        if layer is None or layer.isStale():
+            layer = BackgroundLayer(path, self.asset_cache)
+            self.backgrounds[path] = layer
+        return layer
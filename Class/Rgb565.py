@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from PIL import Image
+
+
+class Rgb565:
+    """
+        Batched RGB565 pixel conversion
+
+        Produce the little-endian 16 bits pixel buffer expected by the screen
+    """
+
+    DTYPE: np.dtype = np.dtype('<u2')
+    BYTES_PER_PIXEL: int = 2
+
+    @staticmethod
+    def toRGB(image: Image.Image) -> Image.Image:
+        """
+            Get an RGB view of the image
+
+            RGBA alpha channel is dropped like the screen does, L and P are expanded
+        """
+        if image.mode == 'RGB':
+            return image
+        return image.convert('RGB')
+
+    @staticmethod
+    def fromArray(rgb: np.ndarray) -> np.ndarray:
+        """
+            Convert an (height, width, 3) uint8 array to an (height, width) RGB565 array
+        """
+        r: np.ndarray = (rgb[..., 0] >> 3).astype(Rgb565.DTYPE)
+        g: np.ndarray = (rgb[..., 1] >> 2).astype(Rgb565.DTYPE)
+        b: np.ndarray = (rgb[..., 2] >> 3).astype(Rgb565.DTYPE)
+        return (r << 11) | (g << 5) | b
+
+    @staticmethod
+    def fromColor(color: tuple) -> int:
+        """
+            Convert an (r, g, b) color to an RGB565 value
+        """
+        return ((color[0] >> 3) << 11) | ((color[1] >> 2) << 5) | (color[2] >> 3)
+
+    @staticmethod
+    def fromImage(image: Image.Image, box: tuple | None = None) -> np.ndarray:
+        """
+            Convert a Pillow image (or the box region of it) to an RGB565 array
+        """
+        if box is not None:
+            image = image.crop(box)
+        rgb: np.ndarray = np.asarray(Rgb565.toRGB(image), dtype=np.uint8)
+        return Rgb565.fromArray(rgb)
+
+    @staticmethod
+    def toBytes(image: Image.Image, box: tuple | None = None) -> bytes:
+        """
+            Convert a Pillow image (or the box region of it) to RGB565 bytes
+        """
+        return Rgb565.fromImage(image, box).tobytes()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import threading
+from array import array
+
+
+class RingBuffer:
+    """
+        Fixed size history of timestamped samples
+
+        Timestamps and numeric values are kept in preallocated arrays, the formatted text
+        of each sample is kept alongside
+    """
+
+    def __init__(self, size: int) -> None:
+        assert size > 0, 'Ring buffer size must be > 0'
+        self.size: int = size
+        self.timestamps: array = array('d', bytes(8 * size))
+        self.values: array = array('d', bytes(8 * size))
+        self.texts: list[str] = [''] * size
+        self.count: int = 0
+        self.head: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def append(self, timestamp: float, value: float, text: str = '') -> None:
+        """
+            Add a sample, overwriting the oldest one when full
+        """
+        with self.lock:
+            self.timestamps[self.head] = timestamp
+            self.values[self.head] = value
+            self.texts[self.head] = text
+            self.head = (self.head + 1) % self.size
+            self.count = min(self.count + 1, self.size)
+
+    def latest(self) -> tuple[float, float, str] | None:
+        """
+            Get the newest (timestamp, value, text) sample
+        """
+        with self.lock:
+            if self.count == 0:
+                return None
+            index: int = (self.head - 1) % self.size
+            return (self.timestamps[index], self.values[index], self.texts[index])
+
+    def last(self, count: int) -> list[tuple[float, float]]:
+        """
+            Get the newest count (timestamp, value) samples, oldest first
+        """
+        with self.lock:
+            count = min(max(count, 0), self.count)
+            return [(self.timestamps[index], self.values[index])
+                    for index in self.__indexes(count)]
+
+    def since(self, timestamp: float) -> list[tuple[float, float]]:
+        """
+            Get the (timestamp, value) samples taken at or after timestamp, oldest first
+        """
+        with self.lock:
+            return [(self.timestamps[index], self.values[index])
+                    for index in self.__indexes(self.count)
+                    if self.timestamps[index] >= timestamp]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __indexes(self, count: int) -> list[int]:
+        return [(self.head - count + i) % self.size for i in range(count)]
@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 
+import heapq
+import math
+import os
 import threading
-from time import sleep, time
+from time import monotonic, perf_counter, sleep
 
+from .Animation import Animation
+from .Collector import Collector
 from .Com import Com
 from .Config import Config
+from .ConfigWatcher import ConfigWatcher
 from .Display import Display
 from .Hardware import Hardware
 from .Logger import logger
+from .MetricRegistry import MetricRegistry
+from .Telemetry import Telemetry
+from .TextPlan import TextPlan
+from .WidgetPlan import WidgetPlan
 
 
 class Scheduler:
@@ -18,14 +28,47 @@ class Scheduler:
     WARN_THREAD_NUMBER: int = 5
     STOPPING: bool = False
 
-    def __init__(self, configuration: Config, theme: str, display: Display, com: Com) -> None:
+    def __init__(self, configuration: Config, theme: str, display: Display, com: Com, telemetry: Telemetry | None = None, collector: Collector | None = None) -> None:
+        """
+            Give a collector to share the metric sampling with other schedulers, its owner starts and stops it
+        """
         self.configuration: Config = configuration
         self.config: dict = configuration.config
         self.theme: str = theme
         self.display: Display = display
         self.com: Com = com
-        self.hardware: Hardware = Hardware()
+        self.owns_collector: bool = collector is None
+        if collector is None:
+            collector = Collector.fromConfig(self.config, telemetry)
+        self.collector: Collector = collector
+        self.registry: MetricRegistry = collector.registry
+        self.telemetry: Telemetry | None = telemetry
+        if telemetry:
+            telemetry.addSource('scheduler', self.stats,
+                                'device', self.config.get('device', ''))
+            if self.owns_collector:
+                telemetry.addSource('hardware', self.registry.hardware.stats)
+                telemetry.addSource('metric_registry', self.registry.stats)
         self.threads: list[threading.Thread] = []
+        self.watcher: ConfigWatcher | None = None
+        self.img_static: str = ''
+        self.txt_static: str = ''
+        self.txt_dynamic: str = ''
+        self.widget_key: str = ''
+        self.static_plans: tuple[TextPlan, ...] = ()
+        self.static_texts: dict[int, str] = {}
+        self.dynamic_plans: tuple[TextPlan, ...] = ()
+        self.rendered_texts: dict[int, str] = {}
+        self.debug_plans: tuple[TextPlan, ...] = ()
+        self.debug_texts: dict[int, str] = {}
+        self.widget_plans: tuple[WidgetPlan, ...] = ()
+        self.widget_deadlines: list[float] = []
+        self.schedule: list[tuple[float, int, float]] = []
+        self.frames: int = 0
+        self.missed_deadlines: int = 0
+        self.frame_time: float = 0.0
+        self.last_frame: float = 0.0
+        self.frame_time_total: float = 0.0
 
     def run(self, params: dict) -> None:
         """
@@ -34,160 +77,414 @@ class Scheduler:
             {
                 'static': 'my_conf_key_for_static_elem',
                 'dynamic': 'my_conf_key_for_dynamic_elem',
-                'images': 'my_conf_key_for_images'
+                'images': 'my_conf_key_for_images',
+                'widgets': 'my_conf_key_for_widgets'
             }
         """
-        self.display.displayBitmap(self.theme, 0, 0)
-        txt_static: str = params.get('txt_static', '')
-        txt_dynamic: str = params.get('txt_dynamic', '')
-        img_static: str = params.get('img_static', '')
-        self.__generateImage(img_static)
-        self.__generateTextInformation(txt_static, False)
+        self.start(params)
+        deadline: float = monotonic()
         while not self.STOPPING:
-            if threading.activeCount() > self.WARN_THREAD_NUMBER:
-                logger.warning('Active hread count is high ' +
-                               str(threading.active_count()))
-            start_time = time()
-            self.__generateTextInformation(txt_dynamic)
-            self.__displayFps(start_time)
-            self.__runThreads(self.threads)
-            if self.config.get('hot_reload_config', False):
-                update_running: bool = self.__isThreadRunning(
-                    'update-config-thread')
-                if not update_running:
-                    self.__runThreads([
-                        threading.Thread(
-                            name='update-config-thread',
-                            target=self.__updateConfiguration,
-                            args=[self.config.get('hot_reload_interval', 60)]
-                        )
-                    ], False)
-
-    def __generateTextInformation(self, target: str, dynamic: bool = True) -> threading.Thread:
+            workers: int = sum(1 for thread in threading.enumerate()
+                               if not thread.daemon)
+            if workers > self.WARN_THREAD_NUMBER:
+                logger.warning('Active thread count is high ' + str(workers))
+            self.tick()
+            deadline = self.__waitNextFrame(deadline)
+
+    def start(self, params: dict) -> None:
         """
-            Generate text information
+            Display the theme, images and static elements, then start sampling metrics
         """
-        named_item: dict
-        for named_item in self.config.get(target, []):
-            element: dict = next(iter(named_item.values()))
-            text: str = self.__getMetricValue(
-                element['metric'] if 'metric' in element else None,
-                element['param'] if 'param' in element else None
-            )
-            if not text:
-                text: str = element['text'] if 'text' in element else ''
-            final_text: str = self.display.generateText(
-                text, element['prefix_txt'] if 'prefix_txt' in element else '')
+        self.display.displayBitmap(self.theme, 0, 0)
+        self.txt_static = params.get('txt_static', '')
+        self.txt_dynamic = params.get('txt_dynamic', '')
+        self.img_static = params.get('img_static', '')
+        self.widget_key = params.get('widgets', '')
+        self.__generateImage(self.img_static)
+        self.__planStatic()
+        self.__plan()
+        if self.owns_collector:
+            self.collector.start()
+        self.__watchConfiguration()
 
-            arguments = {
-                'text': final_text,
-                'x': element['x'] if self.configuration.getKey('x', element) else self.display.DEFAULT_TEXT_PARAM['x'],
-                'y': element['y'] if self.configuration.getKey('y', element) else self.display.DEFAULT_TEXT_PARAM['y'],
-                'font_path': element['font_path'] if self.configuration.getKey('font_path', element) else self.display.DEFAULT_TEXT_PARAM['font_path'],
-                'font_size': element['font_size'] if self.configuration.getKey('font_size', element) else self.display.DEFAULT_TEXT_PARAM['font_size'],
-                'font_color': tuple(element['font_color']) if self.configuration.getKey('font_color', element) else self.display.DEFAULT_TEXT_PARAM['font_color'],
-                'background_color': element['background_color'] if self.configuration.getKey('background_color', element) else self.display.DEFAULT_TEXT_PARAM['background_color'],
-                'background_image': self.theme if self.configuration.getKey('transparent', element) and element[
-                    'transparent'] == True else element['background_image'] if self.configuration.getKey('background_image', element) else self.display.DEFAULT_TEXT_PARAM['background_image'],
-            }
+    def tick(self) -> None:
+        """
+            Draw one frame, applying a reloaded configuration first
+
+            Raise the serial error of a panel that stopped answering
+        """
+        self.com.check()
+        start: float = perf_counter()
+        frame_start: float = monotonic()
+        if self.frames > 0:
+            self.frame_time = frame_start - self.last_frame
+            self.frame_time_total += self.frame_time
+        self.last_frame = frame_start
+        self.frames += 1
+        configuration: Config | None = self.watcher.poll() if self.watcher else None
+        if configuration:
+            self.__applyConfiguration(configuration)
+        self.__generateTextInformation(self.dynamic_plans)
+        self.__displayFps()
+        self.display.beginFrame()
+        self.__runThreads(self.threads)
+        self.__updateWidgets()
+        self.display.endFrame()
+        if self.telemetry:
+            self.telemetry.observe('frame_seconds', perf_counter() - start)
 
+    def interrupt(self) -> None:
+        """
+            Make run return after the current frame, safe to call from a signal handler
+        """
+        self.STOPPING = True
+
+    def stop(self) -> None:
+        """
+            Stop sampling metrics, watching the configuration and playing animations
+        """
+        if self.owns_collector:
+            self.collector.stop()
+        else:
+            self.collector.setMetrics({}, self)
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+        self.display.stopAnimations()
+
+    def stats(self) -> dict:
+        """
+            Get frame pacing counters
+        """
+        frame_time_avg: float = self.frame_time_total / \
+            (self.frames - 1) if self.frames > 1 else 0.0
+        return {
+            'frames': self.frames,
+            'fps': 1.0 / frame_time_avg if frame_time_avg > 0 else 0.0,
+            'missed_deadlines': self.missed_deadlines,
+            'frame_time': self.frame_time,
+            'frame_time_avg': frame_time_avg
+        }
+
+    def __waitNextFrame(self, deadline: float) -> float:
+        """
+            Sleep until the next frame deadline of target_fps, get the new deadline
+        """
+        target_fps: float = self.config.get('target_fps', 10)
+        if target_fps <= 0:
+            return monotonic()
+        deadline += 1.0 / target_fps
+        now: float = monotonic()
+        if now > deadline:
+            self.missed_deadlines += 1
+            return now
+        sleep(deadline - now)
+        return deadline
+
+    def __generateTextInformation(self, plans: tuple[TextPlan, ...], dynamic: bool = True) -> None:
+        """
+            Generate text information
+        """
+        sampled: dict[tuple[str, str | None], str | Exception] = {}
+        if dynamic:
+            indexes: list[int] = self.__dueElements()
+        else:
+            indexes: list[int] = [index for index in range(len(plans))
+                                  if index not in self.static_texts]
+            sampled = self.registry.collect({(plans[index].metric, plans[index].param)
+                                             for index in indexes if plans[index].provided})
+        index: int
+        for index in indexes:
+            plan: TextPlan = plans[index]
+            if not plan.provided:
+                text: str = ''
+            elif dynamic:
+                text: str = self.collector.latest(plan.metric, plan.param)
+            else:
+                result: str | Exception = sampled[(plan.metric, plan.param)]
+                if isinstance(result, Exception):
+                    logger.warning('Unable to sample ' + plan.metric + ' ' + str(result))
+                    text: str = ''
+                else:
+                    text: str = result
+            if not text:
+                text: str = plan.text
+            final_text: str = self.display.generateText(text, plan.prefix)
+            if not final_text:
+                continue  # metric not sampled yet
             if dynamic:
-                self.threads.append(threading.Thread(
-                    name=list(named_item.keys())[0], target=self.display.displayText, kwargs=arguments))
+                if self.rendered_texts.get(index) == final_text:
+                    continue  # already on screen
+                self.rendered_texts[index] = final_text
+                self.threads.append(self.__textThread(plan, final_text))
             else:
-                self.display.displayText(**arguments)
+                self.static_texts[index] = final_text
+                self.display.displayText(*self.__textArguments(plan, final_text))
+
+    def __textThread(self, plan: TextPlan, text: str) -> threading.Thread:
+        """
+            Make the thread displaying text with the plan
+        """
+        return threading.Thread(name=plan.name, target=self.display.displayText,
+                                args=self.__textArguments(plan, text))
+
+    def __textArguments(self, plan: TextPlan, text: str) -> tuple:
+        """
+            Get the displayText arguments of the plan
+        """
+        return (text, plan.x, plan.y, plan.font_path, plan.font_size, plan.font_color,
+                plan.background_color, plan.background_image, plan.name)
+
+    def __planStatic(self) -> None:
+        """
+            Compile the static elements and display the ones not already on screen
+        """
+        plans: tuple[TextPlan, ...] = TextPlan.compile(
+            self.config.get(self.txt_static, []), self.theme, self.registry)
+        kept: dict[int, int] = self.__matchPlans(
+            self.static_plans, self.static_texts, plans)
+        self.static_texts = {index: self.static_texts[old_index]
+                             for index, old_index in kept.items()
+                             if old_index in self.static_texts}
+        self.static_plans = plans
+        self.__generateTextInformation(plans, False)
+
+    def __plan(self) -> None:
+        """
+            Compile the dynamic elements and schedule them, using their refresh_ms or the loop rate
+
+            Elements unchanged since the previous plan keep their schedule and are not drawn again
+        """
+        now: float = monotonic()
+        plans: tuple[TextPlan, ...] = TextPlan.compile(
+            self.config.get(self.txt_dynamic, []), self.theme, self.registry)
+        kept: dict[int, int] = self.__matchPlans(
+            self.dynamic_plans, self.rendered_texts, plans)
+        deadlines: dict[int, float] = {index: deadline
+                                       for deadline, index, _ in self.schedule}
+        self.rendered_texts = {index: self.rendered_texts[old_index]
+                               for index, old_index in kept.items()
+                               if old_index in self.rendered_texts}
+        self.schedule = [(deadlines.get(kept[index], now) if index in kept else now, index, plan.refresh)
+                         for index, plan in enumerate(plans)]
+        heapq.heapify(self.schedule)
+        self.dynamic_plans = plans
+        self.__planWidgets()
+        self.collector.setMetrics({(plan.metric, plan.param)
+                                   for plan in plans + self.widget_plans if plan.provided}, self)
+
+        debug_conf: dict = self.config.get('debug', {})
+        debug_plans: tuple[TextPlan, ...] = ()
+        if debug_conf.get('show', False):
+            debug_plans = (
+                TextPlan.fromElement('debug-fps', debug_conf, self.theme, self.registry),
+                TextPlan.fromElement('debug-ram', dict(
+                    debug_conf, y=debug_conf['y'] + 20), self.theme, self.registry)
+            )
+        kept = self.__matchPlans(self.debug_plans, self.debug_texts, debug_plans)
+        self.debug_texts = {index: self.debug_texts[old_index]
+                            for index, old_index in kept.items()
+                            if old_index in self.debug_texts}
+        self.debug_plans = debug_plans
+
+    def __planWidgets(self) -> None:
+        """
+            Compile the widgets, unchanged widgets keep their schedule and what is on screen
+
+            Widgets changed or removed are erased, unchanged widgets overlapping an erased one
+            are invalidated by the erase and drawn again at once
+        """
+        now: float = monotonic()
+        plans: tuple[WidgetPlan, ...] = WidgetPlan.compile(
+            self.config.get(self.widget_key, []), self.theme, self.registry)
+        deadlines: dict[WidgetPlan, float] = dict(
+            zip(self.widget_plans, self.widget_deadlines))
+        erased: list[tuple] = [plan.box for plan in self.widget_plans
+                               if plan not in plans]
+        plan: WidgetPlan
+        for plan in self.widget_plans:
+            if plan not in plans:
+                self.display.forgetWidget(plan)
+                self.display.restoreBackground(plan.box, self.theme)
+        for plan in plans:
+            if any(self.__overlaps(plan.box, box) for box in erased):
+                deadlines.pop(plan, None)
+        self.widget_plans = plans
+        self.widget_deadlines = [deadlines.get(plan, now) for plan in plans]
+
+    def __updateWidgets(self) -> None:
+        """
+            Display the widgets due for refresh with the latest value of their metric, sparklines with its history
+        """
+        now: float = monotonic()
+        index: int
+        plan: WidgetPlan
+        for index, plan in enumerate(self.widget_plans):
+            if not plan.provided or self.widget_deadlines[index] > now:
+                continue
+            self.widget_deadlines[index] = max(
+                self.widget_deadlines[index] + plan.refresh, now)
+            if plan.kind == 'sparkline':
+                self.display.displaySparkline(plan, self.collector.history(
+                    plan.metric, plan.param, plan.width))
+                continue
+            value: float = self.collector.latestValue(plan.metric, plan.param)
+            if not math.isnan(value):
+                self.display.displayWidget(plan, value)
+
+    def __matchPlans(self, old_plans: tuple[TextPlan, ...], old_texts: dict[int, str], plans: tuple[TextPlan, ...]) -> dict[int, int]:
+        """
+            Match each unchanged plan with its previous index
+
+            Elements changed or removed are erased from the screen, unchanged elements
+            overlapping an erased one are not matched so they are drawn again
+        """
+        available: dict[TextPlan, list[int]] = {}
+        index: int
+        plan: TextPlan
+        for index, plan in enumerate(old_plans):
+            available.setdefault(plan, []).append(index)
+        kept: dict[int, int] = {}
+        for index, plan in enumerate(plans):
+            if available.get(plan):
+                kept[index] = available[plan].pop(0)
+
+        boxes: dict[int, tuple] = {index: self.display.textBox(
+            text, old_plans[index].x, old_plans[index].y, old_plans[index].font_path, old_plans[index].font_size)
+            for index, text in old_texts.items()}
+        erased: list[tuple] = [box for index, box in boxes.items()
+                               if index not in kept.values()]
+        box: tuple
+        for box in erased:
+            self.display.restoreBackground(box, self.theme)
+        return {index: old_index for index, old_index in kept.items()
+                if old_index not in boxes or not any(self.__overlaps(boxes[old_index], box) for box in erased)}
+
+    @staticmethod
+    def __overlaps(a: tuple, b: tuple) -> bool:
+        return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+    def __dueElements(self) -> list[int]:
+        """
+            Get the index of the elements due for refresh and schedule their next refresh
+        """
+        now: float = monotonic()
+        due: list[tuple[float, int, float]] = []
+        while self.schedule and self.schedule[0][0] <= now:
+            due.append(heapq.heappop(self.schedule))
+        deadline: float
+        index: int
+        interval: float
+        for deadline, index, interval in due:
+            heapq.heappush(self.schedule,
+                           (max(deadline + interval, now), index, interval))
+        return sorted(index for _, index, _ in due)
 
     def __generateImage(self, target: str, dynamic: bool = False):
+        """
+            Display images, GIF files and image sequences are played as animations
+        """
         named_item: dict
         for named_item in self.config.get(target, []):
-            element: dict = self.configuration.getKey(
-                list(named_item.keys())[0])
-            arguments = self.display.DEFAULT_BITMAP_PARAM.copy()
-            imgs_path = self.configuration.getKey('assets_dir') + 'imgs/'
+            element: dict = next(iter(named_item.values()))
+            imgs_path: str = self.config.get('assets_dir', 'assets/') + 'imgs/'
 
             arguments = {
-                'bitmap_path': imgs_path + element['name'] if self.configuration.getKey('name', element) else imgs_path + self.display.DEFAULT_BITMAP_PARAM['bitmap_path'],
-                'x': element['x'] if self.configuration.getKey('x', element) else self.display.DEFAULT_BITMAP_PARAM['x'],
-                'y': element['y'] if self.configuration.getKey('y', element) else self.display.DEFAULT_BITMAP_PARAM['y']
+                'bitmap_path': imgs_path + element['name'] if element.get('name') else imgs_path + self.display.DEFAULT_BITMAP_PARAM['bitmap_path'],
+                'x': element.get('x') or self.display.DEFAULT_BITMAP_PARAM['x'],
+                'y': element.get('y') or self.display.DEFAULT_BITMAP_PARAM['y']
             }
 
-            if not dynamic:
-                self.display.displayBitmap(**arguments)
+            if dynamic:
+                continue
+            if element.get('sequence'):
+                sequence_path: str = imgs_path + element['sequence'] + '/'
+                animation: Animation = self.display.loadAnimation(
+                    [sequence_path + picture for picture in sorted(os.listdir(sequence_path))],
+                    element.get('frame_duration_ms', 100) / 1000)
+                self.display.playAnimation(
+                    animation, arguments['x'], arguments['y'], element.get('loop', 0))
+            elif 'loop' in element and arguments['bitmap_path'].endswith('.gif'):
+                self.display.playAnimation(self.display.loadAnimation(
+                    arguments['bitmap_path']), arguments['x'], arguments['y'], element['loop'])
+            else:
+                try:
+                    self.display.displayBitmap(**arguments)
+                except FileNotFoundError as e:
+                    logger.error('Image not found ' + str(e))
 
     def __runThreads(self, threads: list[threading.Thread], wait_thread: bool = True) -> None:
         """
             Run threads and wait for thread job end
+
+            Every thread is started before the first join, so their render jobs overlap
         """
         thread: threading.Thread
         for thread in threads:
-            if not self.com.serial.isOpen():
-                self.com.serial.open()
             thread.start()
-            if wait_thread:
+        if wait_thread:
+            for thread in threads:
                 thread.join()
-            if self.com.serial.isOpen():
-                self.com.serial.close()
         threads.clear()
 
-    def __displayFps(self, start_time: float) -> None:
-        """
-            Display FPS if configured
-        """
-        if self.config.get('debug', False):
-            debug_conf: dict = self.config.get('debug', {})
-            if debug_conf['show']:
-                fps: str = str(round(1.0 / (time() - start_time), 1))
-                ram: str = Hardware.getCurrentProgramMemoryUsage()
-                fps_arg = self.display.DEFAULT_TEXT_PARAM.copy()
-                ram_arg = self.display.DEFAULT_TEXT_PARAM.copy()
-                fps_arg.update(
-                    text='FPS : ' + fps,
-                    x=debug_conf['x'],
-                    y=debug_conf['y'],
-                    font_color=tuple(debug_conf['font_color']),
-                    font_size=debug_conf['font_size'],
-                    background_image=self.theme if 'transparent' in debug_conf and debug_conf[
-                        'transparent'] == True else self.display.DEFAULT_TEXT_PARAM['background_image']
-                )
-                ram_arg.update(
-                    text='RAM : ' + ram,
-                    x=debug_conf['x'],
-                    y=debug_conf['y'] + 20,
-                    font_color=tuple(debug_conf['font_color']),
-                    font_size=debug_conf['font_size'],
-                    background_image=self.theme if 'transparent' in debug_conf and debug_conf[
-                        'transparent'] == True else self.display.DEFAULT_TEXT_PARAM['background_image']
-                )
-                self.threads.append(threading.Thread(
-                    name='debug-fps', target=self.display.displayText, kwargs=fps_arg))
-                self.threads.append(threading.Thread(
-                    name='debug-ram', target=self.display.displayText, kwargs=ram_arg))
-
-    def __isThreadRunning(self, thread_name: str) -> bool:
-        for thread in threading.enumerate():
-            if thread_name in thread.name:
-                return True
-        return False
-
-    def __updateConfiguration(self, update_time: int = 60) -> None:
-        self.config = Config().load()
-        self.threads.append(
-            threading.Thread(
-                target=self.com.SetBrightness,
-                args=[self.com.BRIGHTNESS_LEVEL.get(
-                    self.config.get('screen_brightness', 0), 0)]
-            )
-        )
-        logger.info(threading.current_thread().name +
-                    ' sleeping for ' + str(update_time) + ' secs')
-        sleep(update_time)
+    def __displayFps(self) -> None:
+        """
+            Display FPS if configured, measured on the real time between frames
+        """
+        if self.debug_plans and self.frame_time > 0:
+            fps: str = str(round(1.0 / self.frame_time, 1))
+            ram: str = Hardware.getCurrentProgramMemoryUsage()
+            self.debug_texts = {0: 'FPS : ' + fps, 1: 'RAM : ' + ram}
+            self.threads.append(self.__textThread(
+                self.debug_plans[0], self.debug_texts[0]))
+            self.threads.append(self.__textThread(
+                self.debug_plans[1], self.debug_texts[1]))
+
+    def __watchConfiguration(self) -> None:
+        """
+            Start or stop watching the configuration file following hot_reload_config
+        """
+        if self.config.get('hot_reload_config', False):
+            if self.watcher is None:
+                self.watcher = ConfigWatcher(
+                    self.configuration.path, self.config.get('hot_reload_interval', 5))
+                self.watcher.start()
+            else:
+                self.watcher.interval = self.config.get('hot_reload_interval', 5)
+        elif self.watcher:
+            self.watcher.stop()
+            self.watcher = None
 
-    def __getMetricValue(self, metric: str | None, param: str | None) -> str:
+    def __applyConfiguration(self, configuration: Config) -> None:
         """
-            Get the metric value from Hardware
+            Swap in a reloaded configuration between frames, only affected elements are planned and drawn again
         """
-        if metric:
-            if param:
-                return getattr(Hardware, metric)(self.hardware, param)
-            return getattr(Hardware, metric)(self.hardware)
-        return ''
+        if self.configuration.device:
+            if configuration.getDevice(self.configuration.device) is None:
+                logger.error('Device ' + self.configuration.device + ' removed from the configuration, keep the previous one')
+                return
+            configuration = configuration.getDevice(self.configuration.device)
+        previous: dict = self.config
+        self.configuration = configuration
+        self.config = configuration.config
+        logger.info('Apply reloaded configuration')
+        if self.config.get('screen_brightness') != previous.get('screen_brightness'):
+            self.com.SetBrightness(self.com.BRIGHTNESS_LEVEL.get(
+                self.config.get('screen_brightness', 0), 0))
+        theme: str = configuration.getTheme()
+        if theme != self.theme:
+            self.theme = theme
+            self.display.stopAnimations()
+            self.display.invalidateBackgrounds()
+            self.display.displayBitmap(self.theme, 0, 0)
+            self.__generateImage(self.img_static)
+            self.static_plans, self.static_texts = (), {}
+            self.dynamic_plans, self.rendered_texts = (), {}
+            self.debug_plans, self.debug_texts = (), {}
+            self.widget_plans, self.widget_deadlines = (), []
+        elif self.config.get(self.img_static) != previous.get(self.img_static):
+            self.display.stopAnimations()
+            self.__generateImage(self.img_static)
+        self.__planStatic()
+        self.__plan()
+        self.__watchConfiguration()
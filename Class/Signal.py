@@ -2,22 +2,30 @@
 
 import os
 import signal
-import sys
-from time import sleep
+import threading
 from tracemalloc import Frame
 from typing import Callable
 
-from .Com import Com
 from .Logger import logger
 
 
 class Signal:
     """
         Use Signal to handle quit stop program
+
+        The handler only sets stop flags, the screens are cleared and the ports closed
+        by the normal shutdown path once the schedulers stopped
     """
 
-    def __init__(self, com: Com) -> None:
-        self.com: Com = com
+    def __init__(self, *stops: Callable[[], None]) -> None:
+        self.stopping: threading.Event = threading.Event()
+        self.stops: list[Callable[[], None]] = list(stops)
+
+    def add(self, stop: Callable[[], None]) -> None:
+        """
+            Also call stop on signal, it must only set flags and return at once
+        """
+        self.stops.append(stop)
 
     def makeHandler(self, handler: Callable):
         """
@@ -33,12 +41,7 @@ class Signal:
             Used to stop application with signal after send a full frame to device
         """
         logger.info('Signal ' + str(signum) + ' detected')
-        if not self.com.serial.isOpen():
-            self.com.serial.open()
-        sleep(0.1)
-        self.com.Clear()
-        self.com.ScreenOff()
-        try:
-            sys.exit(0)
-        except:
-            os._exit(0)
+        self.stopping.set()
+        stop: Callable[[], None]
+        for stop in list(self.stops):
+            stop()
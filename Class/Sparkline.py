@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import math
+
+import numpy as np
+
+from .Rgb565 import Rgb565
+from .WidgetPlan import WidgetPlan
+
+
+class Sparkline:
+    """
+        History graph of a metric rendered column by column in RGB565
+
+        Each new sample draws one column from the previous level to the new one.
+        The panel has no scroll command, so the new column is written at a wrapping cursor
+        and the column after it is blanked, costing about two columns per sample
+    """
+
+    BACKGROUND: int = 0
+    LINE: int = 1
+    FILL: int = 2
+
+    def __init__(self, plan: WidgetPlan, background: np.ndarray) -> None:
+        self.plan: WidgetPlan = plan
+        self.background: np.ndarray = np.array(background, dtype=Rgb565.DTYPE)
+        self.canvas: np.ndarray = self.background.copy()
+        self.plot: np.ndarray = np.zeros(self.background.shape, dtype=np.uint8)
+        self.color: int = Rgb565.fromColor(plan.color)
+        self.fill: int | None = Rgb565.fromColor(
+            plan.fill_color) if plan.fill_color else None
+        self.cursor: int = 0
+        self.level: int | None = None
+        self.last: float = -math.inf
+
+    def push(self, samples: list[tuple[float, float]]) -> list[tuple[np.ndarray, int, int]]:
+        """
+            Draw the (timestamp, value) samples newer than the ones already drawn,
+            get the (tile, x, y) regions to send
+        """
+        values: list[float] = [value for timestamp, value in samples
+                               if timestamp > self.last]
+        if not values:
+            return []
+        full: bool = self.last == -math.inf
+        self.last = samples[-1][0]
+        width: int = self.plan.width
+        if len(values) >= width:
+            values = values[-width:]
+            full = True
+        if full:
+            self.plot[...] = self.BACKGROUND
+            self.cursor = 0
+        return self.__sweep(values, full)
+
+    def invalidate(self) -> None:
+        """
+            Send the whole graph with the next sample
+        """
+        self.last = -math.inf
+        self.level = None
+
+    def __sweep(self, values: list[float], full: bool) -> list[tuple[np.ndarray, int, int]]:
+        width: int = self.plan.width
+        start: int = self.cursor
+        value: float
+        for value in values:
+            self.__column(self.cursor, value)
+            self.cursor = (self.cursor + 1) % width
+        self.plot[:, self.cursor] = self.BACKGROUND
+        if full:
+            self.__paint(0, width)
+            return [(self.canvas.copy(), self.plan.x, self.plan.y)]
+        end: int = start + len(values) + 1
+        if end <= width:
+            return [self.__region(start, end)]
+        return [self.__region(start, width), self.__region(0, end - width)]
+
+    def __column(self, column: int, value: float) -> None:
+        """
+            Plot the column of a sample, joined to the level of the previous one
+        """
+        plan: WidgetPlan = self.plan
+        self.plot[:, column] = self.BACKGROUND
+        if math.isnan(value):
+            self.level = None
+            return
+        fraction: float = min(max((value - plan.min_value) /
+                                  (plan.max_value - plan.min_value), 0.0), 1.0)
+        level: int = round((1.0 - fraction) * (plan.height - 1))
+        if self.fill is not None:
+            self.plot[level + 1:, column] = self.FILL
+        previous: int = level if self.level is None else self.level
+        self.plot[min(previous, level):max(previous, level) + 1, column] = self.LINE
+        self.level = level
+
+    def __paint(self, start: int, end: int) -> None:
+        """
+            Render the plotted columns over the background
+        """
+        plot: np.ndarray = self.plot[:, start:end]
+        canvas: np.ndarray = self.canvas[:, start:end]
+        canvas[...] = self.background[:, start:end]
+        canvas[plot == self.LINE] = self.color
+        if self.fill is not None:
+            canvas[plot == self.FILL] = self.fill
+
+    def __region(self, start: int, end: int) -> tuple[np.ndarray, int, int]:
+        self.__paint(start, end)
+        return self.canvas[:, start:end].copy(), self.plan.x + start, self.plan.y
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import math
+import random
+
+from .Hardware import Hardware
+from .MetricProvider import MetricProvider
+
+
+class SyntheticProvider(MetricProvider):
+    """
+        Deterministic waveforms standing in for real metrics
+
+        Each batch advances the time by step seconds, so a run gives the same values whatever the machine.
+        Waveforms are set per 'metric:param', per metric or for every metric with '*', like :
+
+        {
+            'cpuGetCurrentLoad': {'waveform': 'sine', 'min': 0, 'max': 100, 'period': 30, 'unit': '%'},
+            'ramGetUsed': {'waveform': 'walk', 'min': 1e9, 'max': 8e9, 'unit': 'bytes'}
+        }
+    """
+
+    NAME: str = 'synthetic'
+    WAVEFORMS: tuple[str, ...] = ('constant', 'sine', 'triangle', 'sawtooth', 'square', 'noise', 'walk')
+    DEFAULT_WAVEFORM: dict = {
+        'waveform': 'sine',
+        'min': 0,
+        'max': 100,
+        'period': 60,
+        'phase': 0,
+        'step': 0.1,
+        'unit': '',
+        'rounded': True
+    }
+
+    def __init__(self, hardware: Hardware, config: dict) -> None:
+        super().__init__(hardware, config)
+        synthetic_conf: dict = config.get('metric_providers', {}).get('synthetic', {})
+        self.waveforms: dict[str, dict] = synthetic_conf.get('metrics', {})
+        self.step: float = synthetic_conf.get('step') or \
+            config.get('collector', {}).get('interval_ms', 1000) / 1000
+        self.seed: int = synthetic_conf.get('seed', 0)
+        self.time: float = 0.0
+        self.generators: dict[tuple[str, str | None], random.Random] = {}
+        self.levels: dict[tuple[str, str | None], float] = {}
+        waveform: dict
+        for waveform in self.waveforms.values():
+            assert waveform.get('waveform', 'sine') in self.WAVEFORMS, \
+                'Synthetic waveform must be one of ' + str(self.WAVEFORMS)
+
+    def isAvailable(self) -> bool:
+        return len(self.waveforms) > 0
+
+    def offers(self, metric: str) -> bool:
+        return '*' in self.waveforms or any(name.split(':', 1)[0] == metric for name in self.waveforms)
+
+    def collect(self, requests: list[tuple[str, str | None]]) -> dict[tuple[str, str | None], str | Exception]:
+        results: dict[tuple[str, str | None], str | Exception] = {}
+        metric: str
+        param: str | None
+        for metric, param in requests:
+            waveform: dict | None = self.waveforms.get(metric + ':' + str(param)) or \
+                self.waveforms.get(metric) or self.waveforms.get('*')
+            if waveform is None:
+                results[(metric, param)] = LookupError('No waveform for ' + metric + ' ' + str(param))
+                continue
+            waveform = dict(self.DEFAULT_WAVEFORM, **waveform)
+            value: float = waveform['min'] + self.__level((metric, param), waveform) * \
+                (waveform['max'] - waveform['min'])
+            results[(metric, param)] = self.formatValue(value, waveform['rounded'], waveform['unit'])
+        self.time += self.step
+        return results
+
+    def __level(self, key: tuple[str, str | None], waveform: dict) -> float:
+        """
+            Get the 0 to 1 level of the waveform at the current time
+        """
+        cycle: float = (self.time / waveform['period'] + waveform['phase']) % 1.0
+        match waveform['waveform']:
+            case 'constant':
+                return 0.0 if waveform['max'] == waveform['min'] else \
+                    (waveform.get('value', waveform['min']) - waveform['min']) / (waveform['max'] - waveform['min'])
+            case 'sine':
+                return (1 - math.cos(2 * math.pi * cycle)) / 2
+            case 'triangle':
+                return 1 - abs(2 * cycle - 1)
+            case 'sawtooth':
+                return cycle
+            case 'square':
+                return 1.0 if cycle >= 0.5 else 0.0
+        generator: random.Random = self.__generator(key)
+        if waveform['waveform'] == 'noise':
+            return generator.random()
+        level: float = self.levels.get(key, 0.5) + generator.uniform(-waveform['step'], waveform['step'])
+        self.levels[key] = min(max(level, 0.0), 1.0)
+        return self.levels[key]
+
+    def __generator(self, key: tuple[str, str | None]) -> random.Random:
+        if key not in self.generators:
+            self.generators[key] = random.Random(str(self.seed) + ':' + key[0] + ':' + str(key[1]))
+        return self.generators[key]
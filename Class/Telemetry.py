@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from .Logger import logger
+
+
+class Telemetry:
+    """
+        Latency histograms and counters of the render pipeline, exported in the Prometheus text format
+
+        Served from a local HTTP endpoint and/or written periodically to a textfile
+        (node_exporter textfile collector). Components take a Telemetry or None,
+        when disabled the hot path only pays a None check
+    """
+
+    PREFIX: str = 'turing_screen_'
+    BUCKETS: tuple[float, ...] = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                                  0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+    HELP: dict[str, str] = {
+        'provider_collect_seconds': 'Time to collect a batch of metrics from a provider',
+        'text_render_seconds': 'Time to rasterize a text tile',
+        'rgb565_convert_seconds': 'Time to convert an image to RGB565',
+        'serial_write_seconds': 'Time to write a transaction to the serial port',
+        'frame_seconds': 'Time to build and send a frame',
+        'serial_bytes_total': 'Bytes written to the serial port',
+        'element_bytes_total': 'Pixel bytes sent per element, estimated from the changed pixels inside a frame'
+    }
+
+    def __init__(self) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.histograms: dict[tuple[str, str, str], list] = {}
+        self.counters: dict[tuple[str, str, str], float] = {}
+        self.sources: dict[tuple[str, str, str], Callable[[], dict]] = {}
+        self.stopping: threading.Event = threading.Event()
+        self.server: ThreadingHTTPServer | None = None
+        self.threads: list[threading.Thread] = []
+
+    @staticmethod
+    def fromConfig(config: dict) -> 'Telemetry | None':
+        """
+            Build and start the exporters of the 'telemetry' configuration, None when disabled
+        """
+        telemetry_conf: dict = config.get('telemetry', {})
+        if not telemetry_conf.get('enabled', False):
+            return None
+        telemetry: Telemetry = Telemetry()
+        if telemetry_conf.get('port'):
+            telemetry.serve(telemetry_conf.get('host', '127.0.0.1'),
+                            telemetry_conf['port'])
+        if telemetry_conf.get('textfile'):
+            telemetry.writeTextfile(telemetry_conf['textfile'],
+                                    telemetry_conf.get('textfile_interval', 15))
+        return telemetry
+
+    def observe(self, name: str, seconds: float, label: str = '', value: str = '') -> None:
+        """
+            Record a duration in the histogram name, optionally labelled label=value
+        """
+        with self.lock:
+            histogram: list | None = self.histograms.get((name, label, value))
+            if histogram is None:
+                histogram = [0] * (len(self.BUCKETS) + 1) + [0.0]
+                self.histograms[(name, label, value)] = histogram
+            histogram[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            histogram[-1] += seconds
+
+    def count(self, name: str, amount: float = 1, label: str = '', value: str = '') -> None:
+        """
+            Increase the counter name, optionally labelled label=value
+        """
+        with self.lock:
+            key: tuple[str, str, str] = (name, label, value)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def addSource(self, name: str, stats: Callable[[], dict], label: str = '', value: str = '') -> None:
+        """
+            Export the numeric values of a stats() dict as gauges named name_key,
+            labelled label=value when value is set
+        """
+        self.sources[(name, label if value else '', value)] = stats
+
+    def render(self) -> str:
+        """
+            Get every metric in the Prometheus text format
+        """
+        lines: list[str] = []
+        with self.lock:
+            histograms: dict[tuple[str, str, str], list] = {
+                key: list(histogram) for key, histogram in self.histograms.items()}
+            counters: dict[tuple[str, str, str], float] = dict(self.counters)
+        declared: set[str] = set()
+        name: str
+        label: str
+        value: str
+        for (name, label, value), histogram in sorted(histograms.items()):
+            self.__declare(lines, declared, name, 'histogram')
+            labels: str = label + '="' + value + '",' if label else ''
+            cumulative: int = 0
+            index: int
+            bound: float
+            for index, bound in enumerate(self.BUCKETS):
+                cumulative += histogram[index]
+                lines.append(self.PREFIX + name + '_bucket{' + labels +
+                             'le="' + str(bound) + '"} ' + str(cumulative))
+            cumulative += histogram[len(self.BUCKETS)]
+            lines.append(self.PREFIX + name + '_bucket{' +
+                         labels + 'le="+Inf"} ' + str(cumulative))
+            suffix: str = '{' + labels[:-1] + '}' if labels else ''
+            lines.append(self.PREFIX + name + '_sum' +
+                         suffix + ' ' + repr(histogram[-1]))
+            lines.append(self.PREFIX + name + '_count' +
+                         suffix + ' ' + str(cumulative))
+        for (name, label, value), amount in sorted(counters.items()):
+            self.__declare(lines, declared, name, 'counter')
+            suffix: str = '{' + label + '="' + value + '"}' if label else ''
+            lines.append(self.PREFIX + name + suffix + ' ' + repr(amount))
+        # A gauge family is exported by every source of the same name, its label sets are grouped under one TYPE
+        gauges: dict[str, list[str]] = {}
+        source: str
+        stats: Callable[[], dict]
+        for (source, label, value), stats in sorted(self.sources.items()):
+            try:
+                values: dict = stats()
+            except Exception as e:
+                logger.warning('Telemetry source ' + source + ' failed ' + str(e))
+                continue
+            suffix: str = '{' + label + '="' + value + '"}' if label else ''
+            key: str
+            for key, amount in values.items():
+                if isinstance(amount, (int, float)):
+                    gauges.setdefault(source + '_' + key, []).append(
+                        suffix + ' ' + repr(float(amount)))
+        samples: list[str]
+        for name, samples in gauges.items():
+            self.__declare(lines, declared, name, 'gauge')
+            lines.extend(self.PREFIX + name + sample for sample in samples)
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, host: str = '127.0.0.1', port: int = 9742) -> None:
+        """
+            Serve the metrics on http://host:port/metrics from a background thread
+        """
+        telemetry: Telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body: bytes = telemetry.render().encode()
+                self.send_response(200)
+                self.send_header(
+                    'Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        thread: threading.Thread = threading.Thread(
+            name='telemetry-http', target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        logger.info('Telemetry served on http://' + host + ':' + str(port) + '/metrics')
+
+    def writeTextfile(self, path: str, interval: float = 15) -> None:
+        """
+            Write the metrics to path every interval seconds from a background thread
+        """
+        def run() -> None:
+            while not self.stopping.wait(interval):
+                self.__write(path)
+            self.__write(path)
+
+        thread: threading.Thread = threading.Thread(
+            name='telemetry-textfile', target=run, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        logger.info('Telemetry written to ' + path)
+
+    def stop(self) -> None:
+        """
+            Stop the exporters, the textfile is written a last time
+        """
+        self.stopping.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        thread: threading.Thread
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self.threads.clear()
+
+    def __write(self, path: str) -> None:
+        temporary: str = path + '.tmp'
+        try:
+            with open(temporary, 'w') as f:
+                f.write(self.render())
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.error('Telemetry textfile not written ' + str(e))
+
+    def __declare(self, lines: list[str], declared: set[str], name: str, kind: str) -> None:
+        if name in declared:
+            return
+        declared.add(name)
+        if name in self.HELP:
+            lines.append('# HELP ' + self.PREFIX + name + ' ' + self.HELP[name])
+        lines.append('# TYPE ' + self.PREFIX + name + ' ' + kind)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class TextCache:
+    """
+        LRU cache of rendered RGB565 text tiles
+
+        Tiles are evicted from the least recently used once the memory budget is exceeded
+    """
+
+    def __init__(self, memory_budget: int = 2097152) -> None:
+        self.memory_budget: int = memory_budget
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.tiles: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+
+    def get(self, key: tuple) -> np.ndarray | None:
+        """
+            Get a tile and mark it as recently used
+        """
+        with self.lock:
+            tile: np.ndarray | None = self.tiles.get(key)
+            if tile is None:
+                self.misses += 1
+                return None
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+    def put(self, key: tuple, tile: np.ndarray) -> None:
+        """
+            Store a tile, evicting least recently used tiles if over budget
+        """
+        if tile.nbytes > self.memory_budget:
+            return
+        with self.lock:
+            previous: np.ndarray | None = self.tiles.pop(key, None)
+            if previous is not None:
+                self.size -= previous.nbytes
+            self.tiles[key] = tile
+            self.size += tile.nbytes
+            while self.size > self.memory_budget:
+                _, evicted = self.tiles.popitem(last=False)
+                self.size -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+            Drop every tile
+        """
+        with self.lock:
+            self.tiles.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+            Get cache counters
+        """
+        return {
+            'entries': len(self.tiles),
+            'size': self.size,
+            'memory_budget': self.memory_budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+        }
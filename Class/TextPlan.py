@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+from dataclasses import dataclass, field
+
+from .Display import Display
+from .MetricRegistry import MetricRegistry
+
+
+@dataclass(frozen=True, slots=True)
+class TextPlan:
+    """
+        Compiled render plan of a text element
+
+        Built once from the configuration, the render loop only reads it.
+        Plans compiled from the same element configuration compare equal
+    """
+
+    name: str
+    text: str
+    prefix: str
+    metric: str | None
+    param: str | None
+    x: int
+    y: int
+    font_path: str
+    font_size: int
+    font_color: tuple
+    background_color: tuple
+    background_image: str | None
+    refresh: float
+    provided: bool = field(compare=False)
+
+    @staticmethod
+    def compile(named_items: list[dict], theme: str, registry: MetricRegistry | None) -> tuple['TextPlan', ...]:
+        """
+            Compile every {name: element} item of a configuration list
+        """
+        return tuple(TextPlan.fromElement(name, element, theme, registry)
+                     for named_item in named_items
+                     for name, element in named_item.items())
+
+    @staticmethod
+    def fromElement(name: str, element: dict, theme: str, registry: MetricRegistry | None) -> 'TextPlan':
+        """
+            Resolve an element configuration with the display defaults
+        """
+        defaults: dict = Display.DEFAULT_TEXT_PARAM
+        metric: str | None = element.get('metric')
+        param: str | None = element.get('param')
+        provided: bool = bool(metric and registry and registry.provider(metric))
+        if element.get('transparent') == True:
+            background_image: str | None = theme
+        else:
+            background_image: str | None = element.get(
+                'background_image') or defaults['background_image']
+        return TextPlan(
+            name=name,
+            text=element.get('text', ''),
+            prefix=element.get('prefix_txt', ''),
+            metric=metric,
+            param=param,
+            x=element.get('x') or defaults['x'],
+            y=element.get('y') or defaults['y'],
+            font_path=element.get('font_path') or defaults['font_path'],
+            font_size=element.get('font_size') or defaults['font_size'],
+            font_color=tuple(element.get('font_color')
+                             or defaults['font_color']),
+            background_color=tuple(element.get(
+                'background_color') or defaults['background_color']),
+            background_image=background_image,
+            refresh=element.get('refresh_ms', 0) / 1000,
+            provided=provided
+        )
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+from .Rgb565 import Rgb565
+from .WidgetPlan import WidgetPlan
+
+
+class Widget:
+    """
+        Bar, level meter or ring gauge rendered straight to RGB565
+
+        The filled and empty looks are precomputed once over the background strip, with the fill
+        fraction each pixel turns on at. A value change only redraws the pixels between the old
+        and the new fill edge, for bars and meters that band is a view of the precomputed strips
+    """
+
+    NEVER: float = np.inf
+
+    def __init__(self, plan: WidgetPlan, background: np.ndarray) -> None:
+        self.plan: WidgetPlan = plan
+        self.fraction: float | None = None
+        match plan.kind:
+            case 'bar':
+                self.order: np.ndarray = self.__linear(1, 0)
+            case 'meter':
+                self.order: np.ndarray = self.__linear(plan.segments, plan.gap)
+            case 'ring':
+                self.order: np.ndarray = self.__ring()
+        track: np.ndarray = np.isfinite(self.order)
+        self.empty: np.ndarray = np.array(background, dtype=Rgb565.DTYPE)
+        if plan.track_color:
+            self.empty[track] = Rgb565.fromColor(plan.track_color)
+        self.full: np.ndarray = self.empty.copy()
+        self.full[track] = Rgb565.fromColor(plan.color)
+        if plan.outline and plan.kind != 'ring':
+            border: np.ndarray = np.ones(self.order.shape, dtype=bool)
+            border[1:-1, 1:-1] = False
+            self.order[border] = self.NEVER
+            self.empty[border] = self.full[border] = Rgb565.fromColor(plan.color)
+        self.empty.flags.writeable = False
+        self.full.flags.writeable = False
+
+    def update(self, value: float) -> tuple[np.ndarray, int, int] | None:
+        """
+            Get the (tile, x, y) to send for a new value, None if no pixel changed
+        """
+        plan: WidgetPlan = self.plan
+        fraction: float = min(max((value - plan.min_value) /
+                                  (plan.max_value - plan.min_value), 0.0), 1.0)
+        previous: float | None = self.fraction
+        self.fraction = fraction
+        if previous is None:
+            return np.where(self.order <= fraction, self.full, self.empty), plan.x, plan.y
+        low, high = min(previous, fraction), max(previous, fraction)
+        if low == high:
+            return None
+        changed: np.ndarray = (self.order > low) & (self.order <= high)
+        rows: np.ndarray = np.flatnonzero(changed.any(axis=1))
+        if rows.size == 0:
+            return None
+        columns: np.ndarray = np.flatnonzero(changed.any(axis=0))
+        y0, y1 = int(rows[0]), int(rows[-1]) + 1
+        x0, x1 = int(columns[0]), int(columns[-1]) + 1
+        if plan.kind == 'ring':
+            tile: np.ndarray = np.where(self.order[y0:y1, x0:x1] <= fraction,
+                                        self.full[y0:y1, x0:x1], self.empty[y0:y1, x0:x1])
+        else:
+            tile: np.ndarray = (self.full if fraction > previous else self.empty)[
+                y0:y1, x0:x1]
+        return tile, plan.x + x0, plan.y + y0
+
+    def invalidate(self) -> None:
+        """
+            Redraw the whole widget on next update, used when something else drew over it
+        """
+        self.fraction = None
+
+    def __linear(self, segments: int, gap: int) -> np.ndarray:
+        """
+            Fill thresholds of a bar split in segments, left to right or bottom to top
+        """
+        plan: WidgetPlan = self.plan
+        length: int = plan.height if plan.vertical else plan.width
+        position: np.ndarray = np.arange(length, dtype=np.float32)
+        if plan.vertical:
+            position = position[::-1]
+        segment_length: float = (length - gap * (segments - 1)) / segments
+        assert segment_length > 0, 'Widget is too small for its segments'
+        if segments == 1:
+            order: np.ndarray = (position + 1) / length
+        else:
+            segment: np.ndarray = np.floor(position / (segment_length + gap))
+            inside: np.ndarray = position - segment * \
+                (segment_length + gap) < segment_length
+            order: np.ndarray = np.where(
+                inside, (segment + 1) / segments, self.NEVER)
+        if plan.vertical:
+            return np.repeat(order.astype(np.float32)[:, None], plan.width, axis=1)
+        return np.repeat(order.astype(np.float32)[None, :], plan.height, axis=0)
+
+    def __ring(self) -> np.ndarray:
+        """
+            Fill thresholds of an annulus swept clockwise from start_angle, 0 being 12 o'clock
+        """
+        plan: WidgetPlan = self.plan
+        y, x = np.mgrid[0:plan.height, 0:plan.width].astype(np.float32) + 0.5
+        dx: np.ndarray = x - plan.width / 2
+        dy: np.ndarray = y - plan.height / 2
+        radius: np.ndarray = np.hypot(dx, dy)
+        outer: float = min(plan.width, plan.height) / 2
+        angle: np.ndarray = (np.degrees(np.arctan2(dx, -dy)) - plan.start_angle) % 360
+        inside: np.ndarray = (radius < outer) & (radius >= outer - plan.thickness) & \
+            (angle <= plan.sweep)
+        return np.where(inside, np.maximum(angle / plan.sweep, 1e-6), self.NEVER).astype(np.float32)
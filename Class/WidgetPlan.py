@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+from dataclasses import dataclass, field
+from typing import ClassVar
+
+from .MetricRegistry import MetricRegistry
+
+
+@dataclass(frozen=True, slots=True)
+class WidgetPlan:
+    """
+        Compiled render plan of a bar, level meter, ring gauge or sparkline
+
+        Built once from the configuration like TextPlan,
+        plans compiled from the same element configuration compare equal
+    """
+
+    KINDS: ClassVar[tuple] = ('bar', 'meter', 'ring', 'sparkline')
+    DEFAULT_WIDGET_PARAM: ClassVar[dict] = {
+        'type': 'bar',
+        'x': 0,
+        'y': 0,
+        'width': 100,
+        'height': 10,
+        'min_value': 0,
+        'max_value': 100,
+        'color': (255, 255, 255),
+        'track_color': None,
+        'background_color': (0, 0, 0),
+        'background_image': None,
+        'outline': False,
+        'vertical': False,
+        'segments': 10,
+        'gap': 2,
+        'thickness': 8,
+        'start_angle': 0,
+        'sweep': 360,
+        'fill_color': None
+    }
+
+    name: str
+    kind: str
+    metric: str | None
+    param: str | None
+    x: int
+    y: int
+    width: int
+    height: int
+    min_value: float
+    max_value: float
+    color: tuple
+    track_color: tuple | None
+    background_color: tuple
+    background_image: str | None
+    outline: bool
+    vertical: bool
+    segments: int
+    gap: int
+    thickness: int
+    start_angle: float
+    sweep: float
+    fill_color: tuple | None
+    refresh: float
+    provided: bool = field(default=False, compare=False)
+
+    def __post_init__(self) -> None:
+        assert self.kind in self.KINDS, 'Widget type must be one of ' + str(self.KINDS)
+        assert self.width > 0 and self.height > 0, 'Widget size must be > 0'
+        assert self.max_value > self.min_value, 'Widget max_value must be greater than min_value'
+
+    @property
+    def box(self) -> tuple[int, int, int, int]:
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    @staticmethod
+    def compile(named_items: list[dict], theme: str, registry: MetricRegistry | None) -> tuple['WidgetPlan', ...]:
+        """
+            Compile every {name: element} item of a configuration list
+        """
+        return tuple(WidgetPlan.fromElement(name, element, theme, registry)
+                     for named_item in named_items
+                     for name, element in named_item.items())
+
+    @staticmethod
+    def fromElement(name: str, element: dict, theme: str, registry: MetricRegistry | None) -> 'WidgetPlan':
+        """
+            Resolve an element configuration with the widget defaults
+        """
+        defaults: dict = WidgetPlan.DEFAULT_WIDGET_PARAM
+        metric: str | None = element.get('metric')
+        param: str | None = element.get('param')
+        provided: bool = bool(metric and registry and registry.provider(metric))
+        if element.get('transparent') == True:
+            background_image: str | None = theme
+        else:
+            background_image: str | None = element.get(
+                'background_image') or defaults['background_image']
+        track_color: list | None = element.get(
+            'track_color', defaults['track_color'])
+        fill_color: list | None = element.get(
+            'fill_color', defaults['fill_color'])
+
+        def get(key: str):
+            return element.get(key, defaults[key])
+        return WidgetPlan(
+            name=name,
+            kind=get('type'),
+            metric=metric,
+            param=param,
+            x=get('x'),
+            y=get('y'),
+            width=get('width'),
+            height=get('height'),
+            min_value=get('min_value'),
+            max_value=get('max_value'),
+            color=tuple(get('color')),
+            track_color=tuple(track_color) if track_color else None,
+            background_color=tuple(get('background_color')),
+            background_image=background_image,
+            outline=get('outline'),
+            vertical=get('vertical'),
+            segments=get('segments'),
+            gap=get('gap'),
+            thickness=get('thickness'),
+            start_angle=get('start_angle'),
+            sweep=get('sweep'),
+            fill_color=tuple(fill_color) if fill_color else None,
+            refresh=element.get('refresh_ms', 0) / 1000,
+            provided=provided
+        )
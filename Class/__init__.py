@@ -1,9 +1,31 @@
+from .Animation import *
+from .AnimationPlayer import *
+from .AssetCache import *
+from .BackgroundLayer import *
+from .Benchmark import *
+from .Collector import *
 from .Com import *
+from .Compositor import *
 from .Config import *
+from .ConfigWatcher import *
+from .Device import *
 from .Display import *
+from .Emulator import *
+from .FontPool import *
+from .Framebuffer import *
+from .GlyphAtlas import *
 from .Hardware import *
 from .Logger import *
-from .Nvidia import *
-from .Radeon import *
+from .MetricProvider import *
+from .MetricRegistry import *
+from .RenderPool import *
+from .Rgb565 import *
+from .RingBuffer import *
 from .Scheduler import *
 from .Signal import *
+from .Sparkline import *
+from .Telemetry import *
+from .TextCache import *
+from .TextPlan import *
+from .Widget import *
+from .WidgetPlan import *
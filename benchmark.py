@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+
+from Class import Benchmark, Config, logger
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='benchmark the render and transmit pipeline without hardware')
+    parser.add_argument('--iterations', type=int, default=50,
+                        help='calls per case')
+    parser.add_argument('--baudrate', type=int, default=115200,
+                        help='link speed of the simulated FPS')
+    parser.add_argument('--theme', action='append', dest='themes',
+                        help='theme of the scheduler ticks, every theme by default')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='sample waveforms instead of the machine metrics')
+    parser.add_argument('--render-workers', type=int, default=0,
+                        help='rasterize text in a pool of worker processes')
+    parser.add_argument('--output', default='-',
+                        help='JSON result path, - for stdout')
+    args: argparse.Namespace = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    configuration: Config = Config()
+    configuration.load()
+    result: dict = Benchmark(
+        configuration, args.iterations, args.baudrate, args.synthetic, args.render_workers).run(args.themes)
+
+    if args.output == '-':
+        print(json.dumps(result, indent=4))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=4)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+from time import sleep
+
+from Class import Config, Emulator
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description='serve an emulated screen on a pty, set its path as com_port')
+    parser.add_argument('--png', default='emulator.png',
+                        help='framebuffer dump path')
+    parser.add_argument('--interval', type=float, default=1,
+                        help='seconds between framebuffer dumps')
+    args: argparse.Namespace = parser.parse_args()
+
+    configuration: Config = Config()
+    config: dict = configuration.load()
+
+    emulator: Emulator = Emulator.fromConfig(config)
+    print(emulator.openPty(), flush=True)
+    try:
+        while True:
+            sleep(args.interval)
+            emulator.dump(args.png)
+    except KeyboardInterrupt:
+        print(json.dumps(emulator.stats()))
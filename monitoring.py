@@ -1,28 +1,101 @@
 #!/usr/bin/env python3
 
-from Class import Com, Config, Display, Scheduler, Signal
+import argparse
+import json
+from time import monotonic
+
+IMPORT_START: float = monotonic()
+from Class import AssetCache, Collector, Com, Config, Device, Display, Emulator, Hardware, RenderPool, Scheduler, Signal, Telemetry, logger
+IMPORT_TIME: float = monotonic() - IMPORT_START
 
 if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument('--warm-cache', action='store_true',
+                        help='convert every theme into the asset cache and exit')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print import and hardware detection times as JSON and exit')
+    args: argparse.Namespace = parser.parse_args()
+
     configuration: Config = Config()
     config: dict = configuration.load()
     theme = configuration.getTheme()
 
-    com: Com = Com(config)
-    signal: Signal = Signal(com)
-    signal.makeHandler(signal.sigHandler)
-    display: Display = Display(com, com.serial, config)
-    scheduler: Scheduler = Scheduler(configuration, theme, display, com)
+    if args.warm_cache:
+        AssetCache(config.get('asset_cache', {}).get('path', '.cache/assets/')).warmThemes(
+            config.get('assets_dir', 'assets/'))
+        exit(0)
+
+    if args.startup_report:
+        hardware: Hardware = Hardware(
+            config.get('hardware', {}).get('state_file'))
+        cpu_brand, gpu_brand = hardware.detect()
+        print(json.dumps({'import_package': IMPORT_TIME, 'cpu_brand': cpu_brand,
+                          'gpu_brand': gpu_brand, **hardware.startupStats()}))
+        exit(0)
 
-    scheduler.run({
+    params: dict = {
         'txt_static': 'static_text_informations',
         'txt_dynamic': 'dynamic_text_informations',
-        'img_static': 'static_image'
-    })
-
-    # for picture in sorted(os.listdir(config.get('assets_dir', 'assets/') + 'imgs/surf')):
-    #     threads.append(generateThread(
-    #         display.displayBitmap, {
-    #             "bitmap_path": config.get('assets_dir', 'assets/') + 'imgs/surf/' + picture,
-    #             "x": 100,
-    #             "y": 300,
-    #         }))
+        'img_static': 'static_image',
+        'widgets': 'widgets'
+    }
+    telemetry: Telemetry | None = Telemetry.fromConfig(config)
+    render_pool: RenderPool | None = RenderPool.fromConfig(config, telemetry)
+
+    devices: list[Config] = configuration.getDevices()
+    if devices[0] is not configuration:
+        # One pipeline per panel, sharing the metric sampling and the converted assets
+        collector: Collector = Collector.fromConfig(config, telemetry)
+        asset_cache: AssetCache | None = AssetCache.fromConfig(config)
+        if telemetry:
+            telemetry.addSource('hardware', collector.registry.hardware.stats)
+            telemetry.addSource('metric_registry', collector.registry.stats)
+        signal: Signal = Signal()
+        signal.makeHandler(signal.sigHandler)
+        panels: list[Device] = [Device(device, collector, telemetry, signal, render_pool, asset_cache)
+                                for device in devices]
+        panel: Device
+        for panel in panels:
+            panel.start(params)
+        collector.start()
+        try:
+            while any(panel.isAlive() for panel in panels) and not signal.stopping.wait(1):
+                pass
+            for panel in panels:
+                panel.stop()
+        finally:
+            collector.stop()
+            if render_pool:
+                render_pool.close()
+            if telemetry:
+                telemetry.stop()
+        exit(0)
+
+    transport: Emulator | None = None
+    if config.get('com_port') == 'emulator':
+        transport = Emulator.fromConfig(config)
+    try:
+        com: Com = Com(config, transport, telemetry)
+    except OSError as e:
+        logger.critical('Unable to open the COM port ' + str(e))
+        logger.critical('Please use config.json to define com_port key as correct value or connect the device')
+        exit(128)
+    display: Display = Display(com, com.serial, config, telemetry, render_pool)
+    scheduler: Scheduler = Scheduler(
+        configuration, theme, display, com, telemetry)
+    signal: Signal = Signal(scheduler.interrupt)
+    signal.makeHandler(signal.sigHandler)
+
+    try:
+        scheduler.run(params)
+    finally:
+        scheduler.stop()
+        if not com.error:
+            com.discard()
+            com.Clear()
+            com.ScreenOff()
+        com.close()
+        if render_pool:
+            render_pool.close()
+        if telemetry:
+            telemetry.stop()